@@ -194,7 +194,10 @@ var GaiaApps = {
     var app = apps.getByManifestURL(manifestURL);
     var appName, launchPath;
 
-    if (entryPoint) {
+    if (!app) {
+      // the app has been uninstalled
+      app = null;
+    } else if (entryPoint) {
       if (app.manifest.entry_points[entryPoint]) {
         appName = app.manifest.entry_points[entryPoint].name;
         launchPath = app.manifest.entry_points[entryPoint].launch_path;
@@ -208,6 +211,61 @@ var GaiaApps = {
     GaiaApps.sendLocateResponse(callback, app, appName, launchPath, entryPoint);
   },
 
+  // Returns the installed apps, one entry for each entry point, along with
+  // a generation which changes whenever an app is installed or uninstalled.
+  // If aGeneration is still current the apps are not returned.
+  getAppRegistry: function(aGeneration) {
+    let system = window.wrappedJSObject;
+    if (system.gaiatestAppsGeneration === undefined) {
+      // start from the time so generations differ if the system app reloads
+      system.gaiatestAppsGeneration = Date.now();
+      ['applicationinstall', 'applicationuninstall'].forEach(function(type) {
+        window.addEventListener(type, function() {
+          system.gaiatestAppsGeneration++;
+        });
+      });
+    }
+
+    let result = {generation: system.gaiatestAppsGeneration, apps: null};
+    if (aGeneration === result.generation) {
+      return result;
+    }
+
+    let names = function(aManifest) {
+      let names = [GaiaApps.normalizeName(aManifest.name)];
+      for (let id in aManifest.locales || {}) {
+        if (aManifest.locales[id].name) {
+          names.push(GaiaApps.normalizeName(aManifest.locales[id].name));
+        }
+      }
+      return names;
+    };
+
+    let apps = system.applications || system.Applications;
+    result.apps = [];
+    for (let manifestURL in apps.installedApps) {
+      let app = apps.installedApps[manifestURL];
+      let entryPoints = app.manifest.entry_points;
+      let manifests = {};
+      if (entryPoints) {
+        manifests = entryPoints;
+      } else {
+        manifests[''] = app.manifest;
+      }
+      for (let ep in manifests) {
+        result.apps.push({
+          name: manifests[ep].name,
+          names: names(manifests[ep]),
+          manifestURL: manifestURL,
+          origin: app.origin,
+          entryPoint: ep || null,
+          role: app.manifest.role || null
+        });
+      }
+    }
+    return result;
+  },
+
   // Returns the number of running apps.
   // if includeSystemApps is true then system always-running
   // apps (eg Homescreen) will be counted
@@ -251,33 +309,58 @@ var GaiaApps = {
     }
   },
 
-  // Kills all running apps that may be killed by the user, defined as
-  // being accessible by the Cards View/Stack Manager
+  // Kills the FTU and all running apps that may be killed by the user,
+  // defined as being accessible by the Cards View/Stack Manager. Calls back
+  // once the app windows have been destroyed, with the name and origin of
+  // each killed app.
   killAll: function() {
-    let originsToClose = [];
-    let that = this;
+    let manager = window.wrappedJSObject.appWindowManager ||
+                  new window.wrappedJSObject.AppWindowManager();
+    let windows = [];
+    let origins = {};
+
+    function add(aApp) {
+      // the FTU may also be in the stack, so kill each origin once
+      if (!origins[aApp.origin]) {
+        origins[aApp.origin] = true;
+        windows.push(aApp);
+      }
+    }
 
-    let apps = GaiaApps.getApps();
+    let apps = GaiaApps.getApps(true);
+    for (let id in apps) {
+      if (apps[id].origin === 'app://ftu.gaiamobile.org') {
+        add(apps[id]);
+      }
+    }
+    apps = GaiaApps.getApps();
     for (let id in apps) {
-      let origin = apps[id].origin;
-      originsToClose.push(origin);
+      add(apps[id]);
     }
 
-    if (!originsToClose.length) {
-      marionetteScriptFinished(true);
+    let killed = windows.map(function(app) {
+      return {name: app.name, origin: app.origin};
+    });
+    if (!windows.length) {
+      marionetteScriptFinished(killed);
       return;
     }
 
-    originsToClose.slice(0).forEach(function(origin) {
-      GaiaApps.kill(origin, function() {});
+    windows.forEach(function(app) {
+      console.log('terminating app with origin \'' + app.origin + '\'');
+      manager.kill(app.origin);
     });
 
     // Even after the 'appterminated' event has been fired for an app,
-    // it can still exist in the apps list, so wait until 1 or fewer
+    // it can still exist in the apps list, so also wait until 1 or fewer
     // apps are running (since we don't close the homescreen app).
     waitFor(
-      function() { marionetteScriptFinished(true); },
-      function() { return that.numRunningApps() <= 1; }
+      function() { marionetteScriptFinished(killed); },
+      function() {
+        return windows.every(function(app) {
+          return !app.element && !GaiaApps.isRunning(app.origin);
+        }) && GaiaApps.numRunningApps() <= 1;
+      }
     );
   },
 
@@ -390,6 +473,98 @@ var GaiaApps = {
     return result;
   },
 
+  // Records app transitions, most recent last, in a ring buffer on the
+  // system window. Each entry has the event type, the app name and origin,
+  // a timestamp and, for opened apps, the milliseconds since it started to
+  // open.
+  watchTransitions: function() {
+    let system = window.wrappedJSObject;
+    if (system.gaiatestTransitions) {
+      return;
+    }
+    let transitions = system.gaiatestTransitions = [];
+    let opening = {};
+    let size = 100;
+    let types = ['appwillopen', 'appopened', 'homescreenwillopen',
+                 'homescreenopened', 'activitywillopen', 'activityopened',
+                 'appterminated'];
+    types.forEach(function(type) {
+      window.addEventListener(type, function(evt) {
+        // the detail is an AppWindow, whose properties Xrays hide
+        let app = evt.wrappedJSObject.detail || {};
+        let now = window.performance.now();
+        let entry = {
+          type: type,
+          name: app.name,
+          origin: app.origin,
+          time: now
+        };
+        if (/willopen$/.test(type)) {
+          opening[app.origin] = now;
+        } else if (/opened$/.test(type) && opening[app.origin] !== undefined) {
+          entry.duration = now - opening[app.origin];
+          delete opening[app.origin];
+        }
+        transitions.push(entry);
+        if (transitions.length > size) {
+          transitions.shift();
+        }
+      });
+    });
+  },
+
+  getTransitions: function() {
+    GaiaApps.watchTransitions();
+    return window.wrappedJSObject.gaiatestTransitions;
+  },
+
+  // Waits for the app with the specified name to be displayed, checking
+  // whenever a window is opened or closed, and every 500ms for windows that
+  // do not send these events. Returns the displayed app, or {timeout: true}
+  // after aTimeout milliseconds.
+  waitForDisplayedApp: function(aName, aTimeout, aIgnoreCase) {
+    let done = false;
+    let timer, interval;
+    let types = ['appopened', 'homescreenopened', 'activityopened',
+                 'appclosed', 'activityclosed', 'attentionclosed'];
+
+    function finish(aResult) {
+      done = true;
+      window.clearTimeout(timer);
+      window.clearInterval(interval);
+      types.forEach(function(type) {
+        window.removeEventListener(type, check);
+      });
+      marionetteScriptFinished(aResult);
+    }
+
+    function check() {
+      if (done) {
+        return;
+      }
+      let app;
+      try {
+        app = GaiaApps.getDisplayedApp();
+      } catch (e) {
+        // no app is displayed during some transitions
+        return;
+      }
+      if (app.name === aName || (aIgnoreCase && app.name &&
+          app.name.toLowerCase() === aName.toLowerCase())) {
+        finish(app);
+      }
+    }
+
+    types.forEach(function(type) {
+      window.addEventListener(type, check);
+    });
+    interval = window.setInterval(check, 500);
+    timer = window.setTimeout(function() {
+      finish({timeout: true});
+    }, aTimeout);
+    check();
+  },
+
   /**
    * Uninstalls the app with the specified name.
    */
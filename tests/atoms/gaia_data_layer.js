@@ -106,6 +106,45 @@ var GaiaDataLayer = {
     };
   },
 
+  insertContacts: function(aContacts) {
+    var ids = [];
+    var pending = aContacts.length;
+    var failed = false;
+
+    function done() {
+      if (--pending > 0) {
+        return;
+      }
+      SpecialPowers.removePermission('contacts-create', document);
+      console.log('saved ' + aContacts.length + ' contacts');
+      marionetteScriptFinished(failed ? false : ids);
+    }
+
+    if (!pending) {
+      marionetteScriptFinished(ids);
+      return;
+    }
+
+    SpecialPowers.addPermission('contacts-create', true, document);
+    aContacts.forEach(function(aContact, aIndex) {
+      if (aContact.photo) {
+        var blob = GaiaDataLayer.base64ToBlob(aContact.photo, 'image/jpg');
+        aContact.photo = [blob];
+      }
+      var contact = new mozContact(aContact);
+      var req = window.navigator.mozContacts.save(contact);
+      req.onsuccess = function() {
+        ids[aIndex] = contact.id;
+        done();
+      };
+      req.onerror = function() {
+        console.error('error saving contact', req.error.name);
+        failed = true;
+        done();
+      };
+    });
+  },
+
   insertSIMContact: function(aType, aContact) {
 
     // Get 1st SIM
@@ -161,6 +200,22 @@ var GaiaDataLayer = {
     };
   },
 
+  getContactsCount: function(aCallback) {
+    var callback = aCallback || marionetteScriptFinished;
+    SpecialPowers.addPermission('contacts-read', true, document);
+    var req = window.navigator.mozContacts.getCount();
+    req.onsuccess = function() {
+      console.log('success counting contacts');
+      SpecialPowers.removePermission('contacts-read', document);
+      callback(req.result);
+    };
+    req.onerror = function() {
+      console.error('error counting contacts ' + req.error.name);
+      SpecialPowers.removePermission('contacts-read', document);
+      callback(0);
+    };
+  },
+
   getSIMContacts: function(aType, aCallback) {
     var type = aType || 'adn';
     var callback = aCallback || marionetteScriptFinished;
@@ -260,6 +315,25 @@ var GaiaDataLayer = {
     };
   },
 
+  setSettings: function(aSettings, aReturnOnSuccess) {
+    SpecialPowers.addPermission('settings-write', true, document);
+    SpecialPowers.addPermission('settings-api-write', true, document);
+    var returnOnSuccess = aReturnOnSuccess || aReturnOnSuccess === undefined;
+    console.log('setting ' + Object.keys(aSettings).join(', '));
+    var lock = window.navigator.mozSettings.createLock();
+    var req = lock.set(aSettings);
+    lock.onsettingstransactionsuccess = function() {
+      console.log('settings changed');
+      if (returnOnSuccess) {
+        marionetteScriptFinished(true);
+      }
+    };
+    lock.onsettingstransactionfailure = function() {
+      console.log('error changing settings ' + req.error.name);
+      marionetteScriptFinished(false);
+    };
+  },
+
   connectToWiFi: function(aNetwork, aCallback) {
     var callback = aCallback || marionetteScriptFinished;
     var manager = window.navigator.mozWifiManager;
@@ -0,0 +1,41 @@
+/* This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this file,
+ * You can obtain one at http://mozilla.org/MPL/2.0/. */
+
+'use strict';
+/* global marionetteScriptFinished, SpecialPowers, waitFor */
+/* exported GaiaScripts */
+
+var GaiaScripts = {
+
+  // Returned by call when the script is not registered in this window.
+  unregistered: {gaiatestUnregistered: true},
+
+  // Registers aFactory under aName in the current window. The factory is
+  // called with the Marionette helpers of the calling script and the
+  // arguments, and returns the result of the script.
+  register: function(aName, aFactory) {
+    var content = window.wrappedJSObject;
+    if (!content.gaiatestScripts) {
+      content.gaiatestScripts = {};
+    }
+    content.gaiatestScripts[aName] = aFactory;
+  },
+
+  call: function(aName, aArgs) {
+    var scripts = window.wrappedJSObject.gaiatestScripts;
+    var script = scripts && scripts[aName];
+    if (!script) {
+      return GaiaScripts.unregistered;
+    }
+    // the helpers are globals of the sandbox the script is called from
+    var helpers = {
+      marionetteScriptFinished: typeof marionetteScriptFinished ===
+          'undefined' ? undefined : marionetteScriptFinished,
+      waitFor: typeof waitFor === 'undefined' ? undefined : waitFor,
+      SpecialPowers: typeof SpecialPowers === 'undefined' ?
+          undefined : SpecialPowers
+    };
+    return script(helpers, Array.prototype.slice.call(aArgs));
+  }
+};
@@ -0,0 +1,197 @@
+/* This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this file,
+ * You can obtain one at http://mozilla.org/MPL/2.0/. */
+
+'use strict';
+/* global marionetteScriptFinished */
+/* exported GaiaWait */
+
+var GaiaWait = {
+
+  isDisplayed: function(aElement) {
+    var rect = aElement.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0) {
+      return false;
+    }
+    if (window.getComputedStyle(aElement).visibility === 'hidden') {
+      return false;
+    }
+    for (var el = aElement; el && el.nodeType === 1; el = el.parentNode) {
+      var style = window.getComputedStyle(el);
+      if (style.display === 'none' || style.opacity === '0') {
+        return false;
+      }
+    }
+    return true;
+  },
+
+  // Calls back with {value: result} as soon as aCondition returns a truthy
+  // result, or with {timeout: true} after aTimeout milliseconds. The
+  // condition is checked on every DOM mutation and animation frame.
+  until: function(aCondition, aTimeout, aCallback) {
+    var callback = aCallback || marionetteScriptFinished;
+    var done = false;
+    var observer, frame, timer, timeout;
+
+    function finish(aResult) {
+      done = true;
+      observer.disconnect();
+      window.cancelAnimationFrame(frame);
+      window.clearTimeout(timer);
+      window.clearTimeout(timeout);
+      callback(aResult);
+    }
+
+    function check() {
+      if (done) {
+        return;
+      }
+      var result;
+      try {
+        result = aCondition();
+      } catch (e) {
+        result = null;
+      }
+      if (result) {
+        finish({value: result});
+      } else if (document.hidden) {
+        // animation frames are not run for hidden documents
+        timer = window.setTimeout(check, 100);
+      } else {
+        frame = window.requestAnimationFrame(check);
+      }
+    }
+
+    observer = new window.MutationObserver(function() {
+      window.cancelAnimationFrame(frame);
+      window.clearTimeout(timer);
+      check();
+    });
+    observer.observe(document, {
+      attributes: true,
+      childList: true,
+      characterData: true,
+      subtree: true
+    });
+    timeout = window.setTimeout(function() {
+      console.log('timed out waiting for condition');
+      finish({timeout: true});
+    }, aTimeout);
+    check();
+  },
+
+  // Calls back with {value: true} once the element matching aSelector, or
+  // the document if aSelector is null, has gone aQuietMs without DOM
+  // mutations, scrolling, or changes to the position, size, transform or
+  // opacity of the element and its descendants, which are sampled on every
+  // animation frame so that running transitions and animations count as
+  // activity. Waits for the element to be present first. Calls back with
+  // {timeout: true} if the element is not present and idle within aTimeout
+  // milliseconds.
+  forIdle: function(aSelector, aQuietMs, aTimeout) {
+    var now = window.performance.now.bind(window.performance);
+    var deadline = now() + aTimeout;
+    GaiaWait.until(function() {
+      return aSelector ? document.querySelector(aSelector) :
+                         document.documentElement;
+    }, aTimeout, function(aResult) {
+      if (aResult.timeout) {
+        console.log('timed out waiting for \'' + aSelector + '\' to be present');
+        marionetteScriptFinished(aResult);
+      } else {
+        GaiaWait._forIdleElement(aResult.value, aQuietMs,
+                                 Math.max(deadline - now(), 0));
+      }
+    });
+  },
+
+  _forIdleElement: function(aRoot, aQuietMs, aTimeout) {
+    var types = ['transitionend', 'animationstart', 'animationiteration',
+                 'animationend', 'scroll'];
+    var now = window.performance.now.bind(window.performance);
+    var lastActivity = now();
+    var lastSample = sample();
+    var observer, frame, timer, timeout;
+
+    function sample() {
+      var elements = [aRoot].concat(
+        Array.prototype.slice.call(aRoot.querySelectorAll('*')));
+      return elements.map(function(element) {
+        var rect = element.getBoundingClientRect();
+        var style = window.getComputedStyle(element);
+        return [rect.left, rect.top, rect.width, rect.height,
+                style.transform, style.opacity].join(',');
+      }).join(';');
+    }
+
+    function activity(aEvent) {
+      if (!aEvent || aRoot.contains(aEvent.target) ||
+          (aRoot === document.documentElement && aEvent.target === document)) {
+        lastActivity = now();
+      }
+    }
+
+    function finish(aResult) {
+      observer.disconnect();
+      types.forEach(function(type) {
+        window.removeEventListener(type, activity, true);
+      });
+      window.cancelAnimationFrame(frame);
+      window.clearTimeout(timer);
+      window.clearTimeout(timeout);
+      marionetteScriptFinished(aResult);
+    }
+
+    function check() {
+      var current = sample();
+      if (current !== lastSample) {
+        lastSample = current;
+        activity();
+      }
+      if (now() - lastActivity >= aQuietMs) {
+        finish({value: true});
+      } else if (document.hidden) {
+        // animation frames are not run for hidden documents
+        timer = window.setTimeout(check, 50);
+      } else {
+        frame = window.requestAnimationFrame(check);
+      }
+    }
+
+    observer = new window.MutationObserver(function() {
+      activity();
+    });
+    observer.observe(aRoot, {
+      attributes: true,
+      childList: true,
+      characterData: true,
+      subtree: true
+    });
+    types.forEach(function(type) {
+      window.addEventListener(type, activity, true);
+    });
+    timeout = window.setTimeout(function() {
+      console.log('timed out waiting for element to be idle');
+      finish({timeout: true});
+    }, aTimeout);
+    check();
+  },
+
+  // Waits for the element matching aSelector to be 'present', 'displayed',
+  // 'absent' or 'hidden', calling back with the element when it is present.
+  forSelector: function(aSelector, aState, aTimeout) {
+    GaiaWait.until(function() {
+      var element = document.querySelector(aSelector);
+      switch (aState) {
+        case 'present':
+          return element;
+        case 'displayed':
+          return element && GaiaWait.isDisplayed(element) && element;
+        case 'absent':
+          return !element;
+        case 'hidden':
+          return !element || !GaiaWait.isDisplayed(element);
+      }
+    }, aTimeout);
+  }
+};
@@ -2,8 +2,6 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-import time
-
 try:
     from marionette.wait import Wait
     from marionette.by import By
@@ -16,11 +14,16 @@ except:
                                StaleElementException)
 
 from gaiatest import GaiaApps
+from gaiatest import GaiaWait
 from gaiatest import Accessibility
+from gaiatest import MarionetteClientState
 
 
 class Base(object):
 
+    # the B2G select box wrapper of the displayed app, in the system app
+    _value_selector_locator = (By.CSS_SELECTOR, '.appWindow.active .value-selector')
+
     def __init__(self, marionette):
         self.marionette = marionette
         self.apps = GaiaApps(self.marionette)
@@ -32,53 +35,74 @@ class Base(object):
     def launch(self, launch_timeout=None):
         self.app = self.apps.launch(self.name, self.manifest_url, self.entry_point, launch_timeout=launch_timeout)
 
+    def _css_selector(self, by, locator):
+        # Returns a CSS selector for locators that can be waited for on the device
+        if by == By.CSS_SELECTOR:
+            return locator
+        if by == By.ID:
+            return '[id="%s"]' % locator.replace('"', '\\"')
+
+    def _gaia_wait(self, timeout=None):
+        # Waits on the device with the same default timeout as marionette's Wait
+        return GaiaWait(self.marionette, Wait(self.marionette, timeout).timeout)
+
     def wait_for_element_present(self, by, locator, timeout=None):
+        selector = self._css_selector(by, locator)
+        if selector:
+            return self._gaia_wait(timeout).for_element_present(selector)
         return Wait(self.marionette, timeout, ignored_exceptions=NoSuchElementException).until(
             lambda m: m.find_element(by, locator))
 
+    def no_implicit_wait(self):
+        """Returns a context manager disabling the implicit wait of find_element."""
+        return MarionetteClientState.install(self.marionette).no_implicit_wait()
+
     def wait_for_element_not_present(self, by, locator, timeout=None):
-        self.marionette.set_search_timeout(0)
-        try:
-            return Wait(self.marionette, timeout).until(
-                lambda m: not m.find_element(by, locator))
-        except NoSuchElementException:
-            pass
-        self.marionette.set_search_timeout(self.marionette.timeout or 10000)
+        selector = self._css_selector(by, locator)
+        if selector:
+            return self._gaia_wait(timeout).for_element_not_present(selector)
+        with self.no_implicit_wait():
+            try:
+                return Wait(self.marionette, timeout).until(
+                    lambda m: not m.find_element(by, locator))
+            except NoSuchElementException:
+                pass
 
     def wait_for_element_displayed(self, by, locator, timeout=None):
         Wait(self.marionette, timeout, ignored_exceptions=[NoSuchElementException, StaleElementException]).until(
             lambda m: m.find_element(by, locator).is_displayed())
 
     def wait_for_element_not_displayed(self, by, locator, timeout=None):
-        self.marionette.set_search_timeout(0)
-        try:
-            Wait(self.marionette, timeout, ignored_exceptions=StaleElementException).until(
-                lambda m: not m.find_element(by, locator).is_displayed())
-        except NoSuchElementException:
-            pass
-        self.marionette.set_search_timeout(self.marionette.timeout or 10000)
+        with self.no_implicit_wait():
+            try:
+                Wait(self.marionette, timeout, ignored_exceptions=StaleElementException).until(
+                    lambda m: not m.find_element(by, locator).is_displayed())
+            except NoSuchElementException:
+                pass
 
     def wait_for_condition(self, method, timeout=None, message=None):
         Wait(self.marionette, timeout).until(method, message=message)
 
+    def wait_for_idle(self, by, locator, quiet_ms=200, timeout=None):
+        """Waits for the element to stop changing and animating for quiet_ms."""
+        selector = self._css_selector(by, locator)
+        assert selector, 'Only CSS and ID locators can be waited for to be idle'
+        self._gaia_wait(timeout).for_idle(selector, quiet_ms)
+
     def is_element_present(self, by, locator):
-        self.marionette.set_search_timeout(0)
-        try:
-            self.marionette.find_element(by, locator)
-            return True
-        except NoSuchElementException:
-            return False
-        finally:
-            self.marionette.set_search_timeout(self.marionette.timeout or 10000)
+        with self.no_implicit_wait():
+            try:
+                self.marionette.find_element(by, locator)
+                return True
+            except NoSuchElementException:
+                return False
 
     def is_element_displayed(self, by, locator):
-        self.marionette.set_search_timeout(0)
-        try:
-            return self.marionette.find_element(by, locator).is_displayed()
-        except NoSuchElementException:
-            return False
-        finally:
-            self.marionette.set_search_timeout(self.marionette.timeout or 10000)
+        with self.no_implicit_wait():
+            try:
+                return self.marionette.find_element(by, locator).is_displayed()
+            except NoSuchElementException:
+                return False
 
     def find_select_item(self, match_string):
         _list_item_locator = (
@@ -86,9 +110,8 @@ class Base(object):
             match_string)
         # have to go back to top level to get the B2G select box wrapper
         self.marionette.switch_to_frame()
-        # TODO we should find something suitable to wait for, but this goes too
-        # fast against desktop builds causing intermittent failures
-        time.sleep(0.2)
+        # wait for the select box to finish opening
+        self.wait_for_idle(*self._value_selector_locator)
 
         li = self.wait_for_element_present(*_list_item_locator)
         # We need to keep this because the Ok button may hang over the element and stop
@@ -99,10 +122,7 @@ class Base(object):
 
     def wait_for_select_closed(self, by, locator):
         self.wait_for_element_not_displayed(by, locator)
-
-        # TODO we should find something suitable to wait for, but this goes too
-        # fast against desktop builds causing intermittent failures
-        time.sleep(0.2)
+        self.wait_for_idle(*self._value_selector_locator)
 
         # now back to app
         self.apps.switch_to_displayed_app()
@@ -156,8 +156,7 @@ class Camera(Base):
         switch_to_gallery_button.tap()
         from gaiatest.apps.gallery.app import Gallery
         gallery_app = Gallery(self.marionette)
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == gallery_app.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(gallery_app.name)
         return gallery_app
 
     def wait_for_thumbnail_visible(self):
@@ -252,8 +251,7 @@ class ImagePreview(Base):
         self.marionette.find_element(*self._gallery_button_locator).tap()
         from gaiatest.apps.gallery.app import Gallery
         gallery_app = Gallery(self.marionette)
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == gallery_app.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(gallery_app.name)
         self.wait_for_element_not_displayed(*self._progress_bar_locator)
         Wait(self.marionette).until(expected.element_displayed(
             Wait(self.marionette).until(expected.element_present(
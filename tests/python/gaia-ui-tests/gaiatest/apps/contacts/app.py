@@ -2,6 +2,8 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import json
+
 try:
     from marionette import (expected,
                             Wait)
@@ -13,6 +15,7 @@ except:
     from marionette_driver.by import By
     from marionette_driver.errors import JavascriptException
 
+from gaiatest import GaiaWait
 from gaiatest.apps.base import Base
 from gaiatest.apps.base import PageRegion
 
@@ -30,20 +33,19 @@ class Contacts(Base):
     _status_message_locator = (By.ID, 'statusMsg')
     _confirm_delete_locator = (By.CSS_SELECTOR, 'button.danger[data-l10n-id="delete"]')
     _no_contacts_message_locator = (By.CSS_SELECTOR, '*[data-l10n-id="no-contacts"]')
-    _group_container_selector = "#groups-container"
     _contact_locator = (By.CSS_SELECTOR, 'li[data-uuid]:not([data-group="ice"])')
 
+    # seconds allowed for rendering each contact when waiting for the list
+    _render_timeout_per_contact = 0.05
+
     def launch(self):
         Base.launch(self)
-        Wait(self.marionette, ignored_exceptions=JavascriptException).until(
-            lambda m: m.execute_script('return window.wrappedJSObject.Contacts.asyncScriptsLoaded;') is True)
-        Wait(self.marionette).until(expected.element_displayed(
-            Wait(self.marionette).until(expected.element_present(
-                *self._settings_button_locator))))
+        GaiaWait(self.marionette).until(
+            'return window.wrappedJSObject.Contacts.asyncScriptsLoaded === true;')
+        self.wait_for_element_displayed(*self._settings_button_locator)
 
     def switch_to_contacts_frame(self):
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == self.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(self.name)
         Wait(self.marionette, ignored_exceptions=JavascriptException).until(
             lambda m: m.execute_script('return window.wrappedJSObject.Contacts.asyncScriptsLoaded;') is True)
 
@@ -52,20 +54,54 @@ class Contacts(Base):
         return [self.Contact(marionette=self.marionette, element=contact)
                 for contact in self.marionette.find_elements(*self._contact_locator)]
 
-    def wait_for_contacts(self, number_to_wait_for=1):
-        Wait(self.marionette).until(lambda m: len(m.find_elements(
-            *self._contact_locator)) == number_to_wait_for)
+    @property
+    def contact_list(self):
+        """Returns the uuid, name, full name and element of every contact in the list.
+
+        The names are None for contacts that have not been rendered yet, see
+        wait_for_contacts.
+        """
+        return self.marionette.execute_script("""
+        var rows = document.querySelectorAll(arguments[0]);
+        return Array.prototype.map.call(rows, function(row) {
+          var name = row.querySelector('bdi > strong');
+          var fullName = row.querySelector('p.contact-text bdi');
+          return {
+            uuid: row.dataset.uuid,
+            name: name ? name.textContent : null,
+            full_name: fullName ? fullName.textContent.trim() : null,
+            element: row
+          };
+        });
+        """, script_args=[self._contact_locator[1]])
 
-        # we need to scroll in order to force the rendering of all the contacts
-        height = self.marionette.execute_script("return document.querySelector('[data-uuid]').clientHeight;")
-        for idx in range(number_to_wait_for):
-            self.marionette.execute_script("document.querySelector('{0}').scrollTop = {1}".
-                                            format(self._group_container_selector, idx * height))
+    def wait_for_contacts(self, number_to_wait_for=1):
+        """Waits for the list to hold number_to_wait_for contacts and for all of them to be rendered.
+
+        Rows are only rendered once they have been on screen, so the device
+        scrolls each unrendered row into view until none are left.
+        """
+        timeout = max((self.marionette.timeout or 10000) / 1000.0,
+                      number_to_wait_for * self._render_timeout_per_contact)
+        GaiaWait(self.marionette, timeout).until("""
+          var selector = %(selector)s;
+          if (document.querySelectorAll(selector).length !== %(number)d) {
+            return false;
+          }
+          var pending = document.querySelector(selector + ':not([data-rendered])');
+          if (pending) {
+            pending.scrollIntoView(false);
+            return false;
+          }
+          return true;
+        """ % {'selector': json.dumps(self._contact_locator[1]),
+               'number': number_to_wait_for},
+            message='Timed out waiting for %d contacts to be rendered' % number_to_wait_for)
 
     def contact(self, name):
-        for contact in self.contacts:
-            if contact.name == name:
-                return contact
+        for contact in self.contact_list:
+            if contact['name'] == name:
+                return self.Contact(marionette=self.marionette, element=contact['element'])
 
     def tap_new_contact(self):
         self.marionette.find_element(*self._new_contact_button_locator).tap()
@@ -159,8 +195,7 @@ class Contacts(Base):
                 return ContactDetails(self.marionette)
             elif return_class == 'EditContact':
                 # This may seem superfluous but we can enter EditContact from Contacts, or from ActivityPicker
-                Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == Contacts.name)
-                self.apps.switch_to_displayed_app()
+                self.apps.switch_to_displayed_app(Contacts.name)
                 from gaiatest.apps.contacts.regions.contact_form import EditContact
                 return EditContact(self.marionette)
             else:
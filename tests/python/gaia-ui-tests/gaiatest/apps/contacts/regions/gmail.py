@@ -43,7 +43,6 @@ class GmailLogin(Base):
         Wait(self.marionette).until(expected.element_enabled(grant_access))
         grant_access.tap()
         # Go back to displayed Contacts app before waiting for the picker
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == 'Contacts')
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app('Contacts')
         from gaiatest.apps.contacts.regions.contact_import_picker import ContactImportPicker
         return ContactImportPicker(self.marionette)
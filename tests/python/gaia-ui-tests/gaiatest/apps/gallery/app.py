@@ -49,7 +49,7 @@ class Gallery(Base):
 
     @property
     def gallery_items_number(self):
-        return len(self.thumbnails)
+        return len(self.marionette.find_elements(*self._gallery_items_locator))
 
     def tap_first_gallery_item(self):
         first_gallery_item = self.thumbnails[0]
@@ -77,12 +77,49 @@ class Gallery(Base):
         return [self.Thumbnail(self.marionette, thumbnail, index)
                 for index, thumbnail in enumerate(self.marionette.find_elements(*self._gallery_items_locator))]
 
+    @property
+    def files(self):
+        """Returns the metadata and thumbnail element of every file.
+
+        Each file is a dict of the name, type, size, date, width, height,
+        rotation, whether it is mirrored or a video, and the thumbnail element
+        (None if it has not been rendered), in the order of
+        window.wrappedJSObject.files.
+        """
+        return self.marionette.execute_script("""
+        var thumbnails = {};
+        var images = document.querySelectorAll('div.thumbnail > img.thumbnailImage');
+        for (var i = 0; i < images.length; i++) {
+          thumbnails[images[i].dataset.filename] = images[i].parentNode;
+        }
+        return window.wrappedJSObject.files.map(function(file) {
+          var metadata = file.metadata || {};
+          return {
+            name: file.name,
+            type: file.type,
+            size: file.size,
+            date: file.date,
+            width: metadata.width,
+            height: metadata.height,
+            rotation: metadata.rotation || 0,
+            mirrored: !!metadata.mirrored,
+            video: !!metadata.video,
+            thumbnail: thumbnails[file.name] || null
+          };
+        });
+        """)
+
+    @property
+    def file_thumbnails(self):
+        """Returns the rendered thumbnails along with the metadata of their files."""
+        return [self.Thumbnail(self.marionette, f['thumbnail'], index, f)
+                for index, f in enumerate(self.files) if f['thumbnail']]
+
     def switch_to_camera(self):
         switch_to_camera_button = self.marionette.find_element(*self._switch_to_camera_button_locator)
         switch_to_camera_button.tap()
         camera_app = gaiatest.apps.camera.app.Camera(self.marionette)
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == camera_app.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(camera_app.name)
         return camera_app
 
     def switch_to_multiple_selection_view(self):
@@ -92,10 +129,12 @@ class Gallery(Base):
 
     class Thumbnail(PageRegion):
 
-        def __init__(self, marionette, element, index):
+        def __init__(self, marionette, element, index, metadata=None):
             self.root_element = element
             # Save the index of the element so we can match it to the js files object
             self.index = index
+            # Metadata from Gallery.files, if already known
+            self.metadata = metadata
             Base.__init__(self, marionette)
 
         @property
@@ -103,8 +142,12 @@ class Gallery(Base):
             '''
             The dimensions of the image on disk, is drawn from the image's metadata
             '''
-            return {"height": self.marionette.execute_script('return window.wrappedJSObject.files[%s].metadata.height' % self.index),
-                "width": self.marionette.execute_script('return window.wrappedJSObject.files[%s].metadata.width' % self.index)}
+            if self.metadata:
+                return {"height": self.metadata['height'], "width": self.metadata['width']}
+            return self.marionette.execute_script("""
+              var metadata = window.wrappedJSObject.files[%d].metadata;
+              return {"height": metadata.height, "width": metadata.width};
+            """ % self.index)
 
         def tap(self):
             self.root_element.tap()
@@ -23,8 +23,7 @@ class ViewImage(Base):
 
     def __init__(self, marionette):
         Base.__init__(self, marionette)
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == 'Gallery')
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app('Gallery')
 
         Wait(self.marionette).until(expected.element_displayed(
             Wait(self.marionette).until(expected.element_present(
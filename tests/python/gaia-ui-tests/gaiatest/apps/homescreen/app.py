@@ -2,8 +2,6 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-import time
-
 try:
     from marionette import (expected,
                             Wait)
@@ -15,6 +13,7 @@ except:
     from marionette_driver.by import By
     from marionette_driver.marionette import Actions
 
+from gaiatest import GaiaScripts
 from gaiatest.apps.base import Base
 from gaiatest.apps.base import PageRegion
 
@@ -121,17 +120,17 @@ class Homescreen(Base):
         return self.is_element_present(*self._edit_mode_locator)
 
     def tap_collection(self, collection_name):
-        for root_el in self.marionette.find_elements(*self._homescreen_all_icons_locator):
-            if root_el.text == collection_name:
-                # TODO bug 1043293 introduced a timing/tap race issue here
-                time.sleep(0.5)
-                root_el.tap()
+        for icon in self.icons:
+            if icon['name'] == collection_name:
+                # bug 1043293: taps are missed while the grid is still settling
+                self.wait_for_idle(*self._landing_page_locator)
+                icon['element'].tap()
                 from gaiatest.apps.homescreen.regions.collections import Collection
                 return Collection(self.marionette)
 
     @property
     def app_elements(self):
-        return self.marionette.execute_script("""
+        return GaiaScripts(self.marionette).execute_script('homescreen.app_elements', """
         var gridItems = window.wrappedJSObject.app.grid.getItems();
         var appElements = [];
         for(var i=0; i<gridItems.length; i++){
@@ -141,6 +140,32 @@ class Homescreen(Base):
         return appElements;
         """)
 
+    @property
+    def icons(self):
+        """Returns a snapshot of the icons on the grid, in grid order.
+
+        Each icon is a dict of its name, data-app-state, classes, whether it
+        is an app and its element.
+        """
+        return self.marionette.execute_script("""
+        var icons = [];
+        window.wrappedJSObject.app.grid.getItems().forEach(function(item) {
+          var element = item.element;
+          if (!element || !element.classList.contains('icon') ||
+              element.classList.contains('placeholder')) {
+            return;
+          }
+          icons.push({
+            name: element.textContent.trim(),
+            state: element.getAttribute('data-app-state'),
+            classes: Array.prototype.slice.call(element.classList),
+            app: !!item.app,
+            element: element
+          });
+        });
+        return icons;
+        """)
+
     @property
     def divider_elements(self):
         return self.marionette.find_elements(*self._divider_locator)
@@ -149,22 +174,22 @@ class Homescreen(Base):
     def visible_apps(self):
         # Bug 1020910 - Marionette cannot detect correctly detect icons on vertical homescreen
         # The icons' order on screen is not represented in the DOM, thus we use the grid
-        return [self.InstalledApp(self.marionette, root_element)
-                for root_element in self.app_elements if root_element.is_displayed()]
+        return [self.InstalledApp(self.marionette, icon['element'], icon['name'])
+                for icon in self.icons if icon['app'] and icon['element'].is_displayed()]
 
     def wait_for_number_of_apps(self, number_of_apps=1):
         Wait(self.marionette).until(lambda m: len(self.app_elements) >= number_of_apps)
 
     def installed_app(self, app_name):
-        for root_el in self.marionette.find_elements(*self._homescreen_all_icons_locator):
-            if root_el.text == app_name and (root_el.get_attribute('data-app-state') == 'ready' or
-                'bookmark' in root_el.get_attribute('class') or 'collection' in root_el.get_attribute('class')):
-                return self.InstalledApp(self.marionette, root_el)
+        for icon in self.icons:
+            if icon['name'] == app_name and (icon['state'] == 'ready' or
+                'bookmark' in icon['classes'] or 'collection' in icon['classes']):
+                return self.InstalledApp(self.marionette, icon['element'], icon['name'])
 
     def bookmark(self, bookmark_title):
-        for root_el in self.marionette.find_elements(*self._bookmark_icons_locator):
-            if root_el.text == bookmark_title:
-                return self.InstalledApp(self.marionette, root_el)
+        for icon in self.icons:
+            if icon['name'] == bookmark_title and 'bookmark' in icon['classes']:
+                return self.InstalledApp(self.marionette, icon['element'], icon['name'])
 
     @property
     def number_of_columns(self):
@@ -174,18 +199,21 @@ class Homescreen(Base):
 
         _delete_app_locator = (By.CSS_SELECTOR, 'span.remove')
 
+        def __init__(self, marionette, element, name=None):
+            PageRegion.__init__(self, marionette, element)
+            self._name = name
+
         @property
         def name(self):
-            return self.root_element.text
+            return self._name or self.root_element.text
 
         def tap_icon(self):
             expected_name = self.name
 
-            # TODO bug 1043293 introduced a timing/tap race issue here
-            time.sleep(0.5)
+            # bug 1043293: taps are missed while the grid is still settling
+            self.wait_for_idle(*Homescreen._landing_page_locator)
             self.root_element.tap(y=1)
-            Wait(self.marionette).until(lambda m: self.apps.displayed_app.name.lower() == expected_name.lower())
-            self.apps.switch_to_displayed_app()
+            self.apps.switch_to_displayed_app(expected_name, ignore_case=True)
 
         def tap_delete_app(self):
             """Tap on (x) to delete app"""
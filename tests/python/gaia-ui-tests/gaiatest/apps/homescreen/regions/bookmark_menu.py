@@ -25,8 +25,7 @@ class BookmarkMenu(Base):
 
     def __init__(self, marionette):
         Base.__init__(self, marionette)
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == self.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(self.name)
 
     def tap_add_bookmark_to_home_screen_dialog_button(self):
         element = Wait(self.marionette).until(expected.element_present(
@@ -27,8 +27,7 @@ class Collection(Base):
 
     def __init__(self, marionette):
         Base.__init__(self, marionette)
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == self.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(self.name)
         Wait(self.marionette).until(expected.elements_present(*self._apps_locator))
 
     @property
@@ -49,8 +48,7 @@ class Collection(Base):
 
             self.root_element.tap()
             # Wait for the displayed app to be that we have tapped
-            Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == app_name)
-            self.apps.switch_to_displayed_app()
+            self.apps.switch_to_displayed_app(app_name)
 
             # Wait for title to load (we cannot be more specific because the aut may change)
             Wait(self.marionette).until(lambda m: m.title)
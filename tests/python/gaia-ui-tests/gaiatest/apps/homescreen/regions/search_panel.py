@@ -108,8 +108,7 @@ class SearchPanel(Base):
 
             self.root_element.tap()
             # Wait for the displayed app to be that we have tapped
-            Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == app_name)
-            self.apps.switch_to_displayed_app()
+            self.apps.switch_to_displayed_app(app_name)
 
             # Wait for title to load (we cannot be more specific because the aut may change)
             Wait(self.marionette).until(lambda m: bool(m.title))
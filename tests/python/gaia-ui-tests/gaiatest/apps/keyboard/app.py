@@ -3,17 +3,26 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import json
+
 try:
     from marionette import (expected,
                             Wait)
     from marionette.by import By
+    from marionette.errors import (NoSuchFrameException,
+                                   StaleElementException,
+                                   TimeoutException)
     from marionette.marionette import Actions
 except:
     from marionette_driver import (expected,
                                    Wait)
     from marionette_driver.by import By
+    from marionette_driver.errors import (NoSuchFrameException,
+                                          StaleElementException,
+                                          TimeoutException)
     from marionette_driver.marionette import Actions
 
+from gaiatest import GaiaWait
 from gaiatest.apps.base import Base
 
 
@@ -35,6 +44,12 @@ class Keyboard(Base):
 
     name = "Keyboard"
 
+    # frame of the active keyboard, by Marionette session id
+    _frames = {}
+
+    # seconds to wait for the keys of a planned run before typing it key by key
+    _planned_keys_timeout = 1
+
     # special characters look-up table in English standard keyboard
     lookup_table = {'0': 'º',
                     '?': '¿',
@@ -162,6 +177,23 @@ class Keyboard(Base):
 
     # this is to switch to the frame of keyboard
     def switch_to_keyboard(self):
+        frame = self._frames.get(self.marionette.session_id)
+        if frame is not None:
+            self.marionette.switch_to_frame()
+            try:
+                # the keyboard may have been hidden without being dismissed
+                if self.marionette.execute_script("""
+                        var inputWindow = arguments[0];
+                        while (inputWindow && !inputWindow.classList.contains('inputWindow')) {
+                          inputWindow = inputWindow.parentElement;
+                        }
+                        return !!inputWindow && inputWindow.classList.contains('active');
+                        """, script_args=[frame]):
+                    return self.marionette.switch_to_frame(frame, focus=False)
+            except (NoSuchFrameException, StaleElementException):
+                pass
+            self._forget_frame()
+
         self.marionette.switch_to_frame()
         input_window = self.marionette.find_element(*self._input_window_locator)
         Wait(self.marionette).until(
@@ -170,8 +202,13 @@ class Keyboard(Base):
             % (input_window.is_displayed(), input_window.get_attribute('class')))
 
         keybframe = self.marionette.find_element(*self._keyboard_active_frame_locator)
+        Keyboard._frames = {self.marionette.session_id: keybframe}
         return self.marionette.switch_to_frame(keybframe, focus=False)
 
+    def _forget_frame(self):
+        # the active keyboard frame changes when the keyboard is switched or dismissed
+        Keyboard._frames.pop(self.marionette.session_id, None)
+
     @property
     def current_keyboard(self):
         self.marionette.switch_to_frame()
@@ -186,17 +223,18 @@ class Keyboard(Base):
 
     # this is to tap on desired key on keyboard
     def _tap(self, val):
-        key = Wait(self.marionette).until(expected.element_present(*self._key_locator(val)))
-        Wait(self.marionette).until(expected.element_displayed(key))
+        key = GaiaWait(self.marionette).for_element_displayed(self._key_locator(val)[1])
         Actions(self.marionette).press(key).release().perform()
 
         # These two tap cases are most important because they cause the keyboard to change state which affects next step
         if val.isspace():
             # Space switches back to Default layout
-            Wait(self.marionette).until(lambda m: self._layout_page == 0)
+            GaiaWait(self.marionette).until(
+                'return window.wrappedJSObject.app.layoutManager.currentPageIndex === 0;')
         if val.isupper() and not self._is_upper_case_locked:
             # Tapping key with shift enabled causes the keyboard to switch back to lower
-            Wait(self.marionette).until(lambda m: not self._is_upper_case)
+            GaiaWait(self.marionette).until(
+                'return !window.wrappedJSObject.app.upperCaseStateManager.isUpperCase;')
 
     def _tap_page_switching_key(self, val):
         locator = (self._page_switching_key_locator[0], self._page_switching_key_locator[1] % val)
@@ -232,35 +270,185 @@ class Keyboard(Base):
 
     # this would go through fastest way to tap/click through a string
     def send(self, string):
+        """Types the string, planning the taps from the layout.
+
+        The keys of each page of the current layout are read once. Runs of
+        characters available on the current page in the current case are then
+        tapped with a single action chain, and the keyboard state is only
+        awaited after page switches, shifts, long presses and keys which
+        switch the layout back to the default page.
+        """
         self.switch_to_keyboard()
-        for val in string:
-            if ord(val) > 127:
-                # this would get the right key to long press and switch to the right keyboard
-                middle_key_val = self._find_key_for_longpress(val.encode('UTF-8'))
-                self._switch_to_correct_layout(middle_key_val)
-
-                # find the key to long press and press it to get the extended characters list
-                middle_key = self.marionette.find_element(*self._key_locator(middle_key_val))
-                action = Actions(self.marionette)
-                action.press(middle_key).wait(1).perform()
-
-                # find the targeted extended key to send
-                key = Wait(self.marionette).until(
-                    expected.element_present(*self._key_locator(val)))
-                Wait(self.marionette).until(expected.element_displayed(key))
-                action.move(key).release().perform()
+        pages = self._layout_pages()
+        state = self._wait_for_keyboard_state()
+        index = 0
+        while index < len(string):
+            run = self._plan_run(string[index:], pages, state)
+            if run:
+                try:
+                    keys = GaiaWait(self.marionette, self._planned_keys_timeout).until(
+                        self._displayed_keys_condition % json.dumps(
+                            [self._key_locator(val)[1] for val in run]))
+                except TimeoutException:
+                    # the layout did not hold the keys we expected
+                    run = None
+                else:
+                    action = Actions(self.marionette)
+                    for key in keys:
+                        action.press(key).release()
+                    action.perform()
+                    index += len(run)
+                    state = self._wait_for_keyboard_state(**self._state_after(run, state))
+                    continue
+            transitions = self._plan_transitions(string[index], pages, state)
+            if transitions:
+                for selector, expected_state in transitions:
+                    key = GaiaWait(self.marionette).for_element_displayed(selector)
+                    Actions(self.marionette).press(key).release().perform()
+                    state = self._wait_for_keyboard_state(**expected_state)
             else:
-                # after switching to correct keyboard, tap/click if the key is there
-                self._switch_to_correct_layout(val)
-                self._tap(val)
-
-                # when we tap on '@' the layout switches to the default keyboard - Bug 996332
-                if val == '@':
-                    Wait(self.marionette).until(
-                        lambda m: self._layout_page == 0)
+                self._send_character(string[index])
+                index += 1
+                state = self._wait_for_keyboard_state()
 
         self.apps.switch_to_displayed_app()
 
+    _displayed_keys_condition = """
+      var keys = %s.map(function(selector) {
+        return document.querySelector(selector);
+      });
+      return keys.every(function(key) {
+        return key && GaiaWait.isDisplayed(key);
+      }) && keys;"""
+
+    def _layout_pages(self):
+        """Returns the values of the keys on each page of the current layout."""
+        return self.marionette.execute_script("""
+        var manager = window.wrappedJSObject.app.layoutManager;
+        var layout = manager.loader.getLayout(manager.currentPage.layoutName);
+        var fallback = manager.loader.getLayout(manager.DEFAULT_LAYOUT_NAME);
+        var count = Math.max((layout.pages || []).length,
+                             (fallback.pages || []).length, 1);
+        var pages = [];
+        for (var i = 0; i < count; i++) {
+          // normalized layouts keep the keys of the basic page in pages[0]
+          var page = (layout.pages && layout.pages[i]) ||
+                     (fallback.pages && fallback.pages[i]);
+          if (i === manager.currentPageIndex) {
+            // the current page includes keys added for the input type
+            page = manager.currentPage;
+          }
+          var values = [];
+          ((page && page.keys) || []).forEach(function(row) {
+            row.forEach(function(key) {
+              values.push(key.value);
+              if (key.supportsSwitching) {
+                values.push(key.supportsSwitching.value);
+              }
+            });
+          });
+          pages.push(values);
+        }
+        return pages;
+        """)
+
+    def _wait_for_keyboard_state(self, page=None, upper=None):
+        """Waits for the keyboard to be on the page and in the case given, and returns its state."""
+        return GaiaWait(self.marionette).until("""
+          var app = window.wrappedJSObject.app;
+          var state = {
+            page: app.layoutManager.currentPageIndex,
+            upper: app.upperCaseStateManager.isUpperCase,
+            locked: app.upperCaseStateManager.isUpperCaseLocked
+          };
+          return (%s === null || state.page === %s) &&
+                 (%s === null || state.upper === %s) && state;
+        """ % ((json.dumps(page),) * 2 + (json.dumps(upper),) * 2))
+
+    def _plan_run(self, string, pages, state):
+        """Returns the leading characters of string which can be tapped without changing layout.
+
+        The run ends after a character which changes the state of the
+        keyboard, such as an upper case letter or a space on another page.
+        """
+        current = pages[state['page']] if state['page'] < len(pages) else []
+        run = ''
+        for val in string:
+            if ord(val) > 127:
+                break
+            if val.isalpha():
+                if state['page'] != 0 or val.isupper() != state['upper']:
+                    break
+            elif not (val.isspace() or val in [',', '.'] or val in current):
+                break
+            run += val
+            if self._state_after(val, state) != {'page': state['page'], 'upper': state['upper']}:
+                break
+        return run
+
+    def _plan_transitions(self, val, pages, state):
+        """Returns the keys to tap, with the state each leads to, to make val tappable.
+
+        Returns None when the plan does not cover val, such as for extended
+        characters, in which case the character is typed one key at a time.
+        """
+        if ord(val) > 127:
+            return None
+        page_key = lambda page: self._page_switching_key_locator[1] % page
+        if val.isalpha():
+            if state['page'] != 0:
+                return [(page_key(0), {'page': 0, 'upper': None})]
+            if val.isupper() != state['upper']:
+                return [(self._key_locator(self._upper_case_key)[1],
+                         {'page': 0, 'upper': val.isupper()})]
+            return None
+        target = [i for i, keys in enumerate(pages) if val in keys and i != state['page']]
+        if not target:
+            return None
+        if state['page'] == 0 and target[0] > 1:
+            # the default page only switches to the alternate page
+            return [(page_key(1), {'page': 1, 'upper': None}),
+                    (page_key(target[0]), {'page': target[0], 'upper': None})]
+        return [(page_key(target[0]), {'page': target[0], 'upper': None})]
+
+    def _state_after(self, run, state):
+        val = run[-1]
+        page = state['page']
+        upper = state['upper']
+        # Space and '@' switch back to the default page - Bug 996332
+        if val.isspace() or val == '@':
+            page = 0
+        # Tapping key with shift enabled causes the keyboard to switch back to lower
+        if val.isupper() and not state['locked']:
+            upper = False
+        return {'page': page, 'upper': upper}
+
+    def _send_character(self, val):
+        if ord(val) > 127:
+            # this would get the right key to long press and switch to the right keyboard
+            middle_key_val = self._find_key_for_longpress(val.encode('UTF-8'))
+            self._switch_to_correct_layout(middle_key_val)
+
+            # find the key to long press and press it to get the extended characters list
+            middle_key = self.marionette.find_element(*self._key_locator(middle_key_val))
+            action = Actions(self.marionette)
+            action.press(middle_key).wait(1).perform()
+
+            # find the targeted extended key to send
+            key = Wait(self.marionette).until(
+                expected.element_present(*self._key_locator(val)))
+            Wait(self.marionette).until(expected.element_displayed(key))
+            action.move(key).release().perform()
+        else:
+            # after switching to correct keyboard, tap/click if the key is there
+            self._switch_to_correct_layout(val)
+            self._tap(val)
+
+            # when we tap on '@' the layout switches to the default keyboard - Bug 996332
+            if val == '@':
+                Wait(self.marionette).until(
+                    lambda m: self._layout_page == 0)
+
     # Switch keyboard language
     # Mapping of language code => {
     # "ar":"ﺎﻠﻋﺮﺒﻳﺓ",
@@ -292,6 +480,7 @@ class Keyboard(Base):
         action.press(language_key).wait(1).perform()
         target_kb_layout = self.marionette.find_element(*keyboard_language_locator)
         action.move(target_kb_layout).release().perform()
+        self._forget_frame()
         self.apps.switch_to_displayed_app()
 
     def tap_keyboard_language_key(self):
@@ -300,6 +489,7 @@ class Keyboard(Base):
             expected.element_present(*self._language_key_locator))
         Wait(self.marionette).until(expected.element_displayed(key))
         key.tap()
+        self._forget_frame()
         self.apps.switch_to_displayed_app()
 
     # following are "5 functions" to substitute finish switch_to_frame()s and tap() for you
@@ -331,6 +521,7 @@ class Keyboard(Base):
         self.apps.switch_to_displayed_app()
 
     def dismiss(self):
+        self._forget_frame()
         self.marionette.switch_to_frame()
         # navigator.mozKeyboard is needed for v1.3 support
         self.marionette.execute_script("""
@@ -35,8 +35,7 @@ class Activities(Base):
 
     def tap_settings(self):
         self.marionette.find_element(*self._settings_button_locator).tap()
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == 'Settings')
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app('Settings')
         from gaiatest.apps.messages.regions.messaging_settings import MessagingSettings
         return MessagingSettings(self.marionette)
 
@@ -34,8 +34,7 @@ class NewMessage(Messages):
 
     def __init__(self, marionette):
         Base.__init__(self, marionette)
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == self.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(self.name)
         section = self.marionette.find_element(*self._thread_messages_locator)
         Wait(self.marionette).until(lambda m: section.location['x'] == 0)
 
@@ -82,8 +82,7 @@ class Keypad(BaseKeypad, Phone):
 
     def __init__(self, marionette):
         Phone.__init__(self, marionette)
-        self.wait_for_condition(lambda m: self.apps.displayed_app.name == self.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(self.name)
         keypad_toolbar_button = self.marionette.find_element(*self._keypad_toolbar_button_locator)
         self.wait_for_condition(lambda m: 'toolbar-option-selected' in keypad_toolbar_button.get_attribute('class'))
 
@@ -3,10 +3,8 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 try:
-    from marionette import Wait
     from marionette.by import By
 except:
-    from marionette_driver import Wait
     from marionette_driver.by import By
 
 from gaiatest.apps.base import Base, PageRegion
@@ -19,8 +17,7 @@ class RingTone(Base):
 
     def __init__(self, marionette):
         Base.__init__(self, marionette)
-        Wait(self.marionette).until(lambda m: self.apps.displayed_app.name == self.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(self.name)
 
     def set_ringtone(self):
         self.marionette.find_element(*self._set_button_locator).tap()
@@ -62,9 +62,7 @@ class Settings(Base):
             expected.element_present(*self._app_loaded_locator))
 
     def switch_to_settings_app(self):
-        Wait(self.marionette).until(
-            lambda m: self.apps.displayed_app.name == self.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(self.name)
 
     def wait_for_airplane_toggle_ready(self):
         self._wait_for_toggle_ready(*self._airplane_checkbox_locator)
@@ -39,8 +39,7 @@ class Activities(Base):
         self.wait_for_element_not_displayed(*self._actions_menu_locator)
         from gaiatest.apps.wallpaper.app import Wallpaper
         wallpaper = Wallpaper(self.marionette)
-        self.wait_for_condition(lambda m: self.apps.displayed_app.name == wallpaper.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(wallpaper.name)
         return wallpaper
 
     def tap_gallery(self):
@@ -48,8 +47,7 @@ class Activities(Base):
         self.wait_for_element_not_displayed(*self._actions_menu_locator)
         from gaiatest.apps.gallery.app import Gallery
         gallery = Gallery(self.marionette)
-        self.wait_for_condition(lambda m: self.apps.displayed_app.name == gallery.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(gallery.name)
         return gallery
 
     def tap_camera(self):
@@ -57,8 +55,7 @@ class Activities(Base):
         self.wait_for_element_not_displayed(*self._actions_menu_locator)
         from gaiatest.apps.camera.app import Camera
         camera = Camera(self.marionette)
-        self.wait_for_condition(lambda m: self.apps.displayed_app.name == camera.name)
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app(camera.name)
         camera.wait_for_loading_spinner_displayed()
         camera.wait_for_loading_spinner_hidden()
         camera.wait_for_capture_ready()
@@ -2,7 +2,6 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-import time
 try:
     from marionette.by import By
     from marionette.marionette import Actions
@@ -49,8 +48,7 @@ class CardsView(Base):
         cards = self.marionette.find_element(*self._cards_view_locator)
         card = self.marionette.find_element(*self._app_card_locator(app))
         self.wait_for_condition(lambda m: cards.size['width'] - card.size['width'] == 2 * card.location['x'])
-        # TODO: Remove sleep when we find a better wait
-        time.sleep(0.2)
+        self.wait_for_idle(*self._cards_view_locator)
 
     def is_app_displayed(self, app):
         return self.is_element_displayed(*self._app_card_locator(app))
@@ -66,9 +66,7 @@ class FacebookLogin(Base):
         self.tap_submit()
 
         # Go back to displayed Contacts app before waiting for the picker
-        Wait(self.marionette).until(
-            lambda m: self.apps.displayed_app.name == 'Contacts')
-        self.apps.switch_to_displayed_app()
+        self.apps.switch_to_displayed_app('Contacts')
 
         # switch to facebook import page to select the friends
         from gaiatest.apps.contacts.regions.contact_import_picker import ContactImportPicker
@@ -0,0 +1,110 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from contextlib import contextmanager
+
+
+class MarionetteClientState(object):
+    """Tracks the frame, context and search timeout of a Marionette client.
+
+    The client's switch_to_frame, set_context and set_search_timeout are
+    wrapped so that switching to the top level frame, to a context the client
+    is already in, or to the current search timeout does not send a command.
+    The tracked state is forgotten whenever a session is started or deleted,
+    or the window is switched.
+    """
+
+    def __init__(self, marionette):
+        self.marionette = marionette
+        self.reset()
+        for name in ['switch_to_frame', 'set_context', 'set_search_timeout',
+                     'timeouts', 'start_session', 'delete_session',
+                     'switch_to_window']:
+            setattr(self, '_%s' % name, getattr(marionette, name))
+            setattr(marionette, name, getattr(self, name))
+
+    @classmethod
+    def install(cls, marionette):
+        """Returns the state of the client, wrapping it if needed."""
+        state = getattr(marionette, 'client_state', None)
+        if state is None:
+            state = marionette.client_state = cls(marionette)
+        return state
+
+    def reset(self):
+        self.context = None
+        # whether the client is known to be in the top level frame, by context
+        self.top_frame = {}
+        self.search_timeout = None
+
+    @property
+    def current_context(self):
+        """Returns the context the client is in, asking Marionette if it is not known."""
+        if self.context is None:
+            is_chrome = self.marionette.execute_script(
+                "return typeof Components != 'undefined' && "
+                "window instanceof Components.interfaces.nsIDOMChromeWindow;")
+            self.context = (self.marionette.CONTEXT_CHROME if is_chrome
+                            else self.marionette.CONTEXT_CONTENT)
+        return self.context
+
+    def switch_to_frame(self, frame=None, focus=True):
+        if frame is None and self.context and self.top_frame.get(self.context):
+            return
+        result = self._switch_to_frame(frame, focus)
+        if self.context:
+            self.top_frame[self.context] = frame is None
+        return result
+
+    def set_context(self, context):
+        if context == self.context:
+            return
+        self.context = None
+        self._set_context(context)
+        self.context = context
+
+    def set_search_timeout(self, timeout):
+        if timeout == self.search_timeout:
+            return
+        self.search_timeout = None
+        self._set_search_timeout(timeout)
+        self.search_timeout = timeout
+
+    def timeouts(self, timeout_type, ms):
+        if timeout_type == self.marionette.TIMEOUT_SEARCH:
+            self.search_timeout = None
+        self._timeouts(timeout_type, ms)
+        if timeout_type == self.marionette.TIMEOUT_SEARCH:
+            self.search_timeout = ms
+
+    @contextmanager
+    def no_implicit_wait(self):
+        """Disables the implicit wait of find_element for a block of checks.
+
+        The previous search timeout is restored when the block exits. Nested
+        blocks and consecutive blocks only send a command when the timeout
+        actually changes.
+        """
+        previous = self.search_timeout
+        if previous is None:
+            previous = self.marionette.timeout or 10000
+        self.set_search_timeout(0)
+        try:
+            yield
+        finally:
+            self.set_search_timeout(previous)
+
+    def start_session(self, *args, **kwargs):
+        self.reset()
+        result = self._start_session(*args, **kwargs)
+        self.context = self.marionette.CONTEXT_CONTENT
+        return result
+
+    def delete_session(self, *args, **kwargs):
+        self.reset()
+        return self._delete_session(*args, **kwargs)
+
+    def switch_to_window(self, *args, **kwargs):
+        self.top_frame = {}
+        return self._switch_to_window(*args, **kwargs)
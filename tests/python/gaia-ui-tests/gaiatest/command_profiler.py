@@ -0,0 +1,115 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from collections import OrderedDict
+import json
+import os
+import sys
+import time
+
+
+class MarionetteCommandProfiler(object):
+    """Records every command sent by a Marionette client.
+
+    For each command the profiler records the wire command name (such as
+    executeScript, findElement or switchToFrame), the wall time of the round
+    trip, the size of the payload and the gaiatest call site that sent it.
+    Commands are grouped by the test that was running at the time.
+    """
+
+    package_root = os.path.dirname(os.path.abspath(__file__))
+    # modules that wrap the client, so never the call site of a command
+    wrapper_modules = set(os.path.join(package_root, name)
+                          for name in ['command_profiler', 'client_state'])
+
+    def __init__(self, marionette):
+        self.marionette = marionette
+        self.tests = OrderedDict()
+        self.current = None
+        self._send_message = marionette._send_message
+        marionette._send_message = self.send_message
+
+    @classmethod
+    def install(cls, marionette):
+        """Returns the profiler for the client, wrapping it if needed."""
+        profiler = getattr(marionette, 'command_profiler', None)
+        if profiler is None:
+            profiler = marionette.command_profiler = cls(marionette)
+        return profiler
+
+    def send_message(self, command, *args, **kwargs):
+        start = time.time()
+        try:
+            return self._send_message(command, *args, **kwargs)
+        finally:
+            if self.current is not None:
+                self.current.append({
+                    'command': command,
+                    'duration': time.time() - start,
+                    'size': len(json.dumps(kwargs, default=repr)),
+                    'call_site': self.call_site()})
+
+    def call_site(self):
+        frame = sys._getframe(2)
+        while frame:
+            filename = os.path.abspath(frame.f_code.co_filename)
+            if filename.startswith(self.package_root) and \
+                    os.path.splitext(filename)[0] not in self.wrapper_modules:
+                return '%s:%d (%s)' % (os.path.relpath(filename, self.package_root),
+                                       frame.f_lineno, frame.f_code.co_name)
+            frame = frame.f_back
+        return 'unknown'
+
+    def start_test(self, test_id):
+        self.current = self.tests.setdefault(test_id, [])
+
+    def stop_test(self):
+        self.current = None
+
+    @staticmethod
+    def summarize(commands, limit=10):
+        """Returns totals for the commands, by command and by call site."""
+        summary = {'count': len(commands),
+                   'duration': sum(c['duration'] for c in commands),
+                   'size': sum(c['size'] for c in commands),
+                   'commands': {},
+                   'call_sites': {}}
+        for c in commands:
+            for key, group in [(c['command'], 'commands'),
+                               (c['call_site'], 'call_sites')]:
+                totals = summary[group].setdefault(
+                    key, {'count': 0, 'duration': 0, 'size': 0})
+                totals['count'] += 1
+                totals['duration'] += c['duration']
+                totals['size'] += c['size']
+        summary['call_sites'] = dict(sorted(
+            summary['call_sites'].items(),
+            key=lambda item: item[1]['count'], reverse=True)[:limit])
+        return summary
+
+    @property
+    def summary(self):
+        return {
+            'tests': OrderedDict((test_id, self.summarize(commands))
+                                 for test_id, commands in self.tests.items()),
+            'suite': self.summarize(
+                [c for commands in self.tests.values() for c in commands])}
+
+    @staticmethod
+    def format_table(summary):
+        """Returns a plain text table of a summary returned by summarize."""
+        lines = ['%d commands, %.3fs, %d bytes' % (
+            summary['count'], summary['duration'], summary['size'])]
+        for group in ['commands', 'call_sites']:
+            width = max([len(key) for key in summary[group]] + [len(group)])
+            lines.append('')
+            lines.append('%s  %6s  %9s  %10s' % (
+                group.replace('_', ' ').ljust(width), 'count', 'time (s)', 'bytes'))
+            for key, totals in sorted(summary[group].items(),
+                                      key=lambda item: item[1]['count'],
+                                      reverse=True):
+                lines.append('%s  %6d  %9.3f  %10d' % (
+                    key.ljust(width), totals['count'],
+                    totals['duration'], totals['size']))
+        return '\n'.join(lines)
@@ -3,8 +3,13 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 from abc import ABCMeta, abstractmethod
+import hashlib
+from multiprocessing.pool import ThreadPool
 import os
+import pipes
 import shutil
+import tarfile
+import tempfile
 
 import mozlog
 
@@ -29,20 +34,24 @@ class GaiaFileManager(object):
 
     def duplicate_file(self, path, count):
         """Create duplicates of a file on the system and remove original."""
-        original = path
-        path, sep, filename = path.rpartition('/')
         # We copy the file we've just created rather than pushing it
         # multiple times, which would be much slower.
-        for i in range(1, count + 1):
-            # Make the remote filename unique by including an index
-            if '.' in filename:
-                indexed_filename = '_%d.'.join(iter(
-                    filename.rsplit('.', 1))) % i
-            else:
-                indexed_filename = '%s_%d' % (filename, i)
-            duplicate = '/'.join([path, indexed_filename])
-            self.copy_file(original, duplicate)
-        self.remove(original)
+        for duplicate in self._duplicate_paths(path, count):
+            self.copy_file(path, duplicate)
+        self.remove(path)
+
+    def _duplicate_template(self, path):
+        """Return the prefix and suffix around the index of duplicates."""
+        path, sep, filename = path.rpartition('/')
+        # Make the remote filename unique by including an index
+        if '.' in filename:
+            name, extension = filename.rsplit('.', 1)
+            return '/'.join([path, '%s_' % name]), '.%s' % extension
+        return '/'.join([path, '%s_' % filename]), ''
+
+    def _duplicate_paths(self, path, count):
+        prefix, suffix = self._duplicate_template(path)
+        return ['%s%d%s' % (prefix, i, suffix) for i in range(1, count + 1)]
 
     @abstractmethod
     def file_exists(self, path):
@@ -58,18 +67,61 @@ class GaiaFileManager(object):
     def make_dirs(self, filename):
         """Make directory structure."""
 
+    @abstractmethod
+    def pull_tree(self, remote_path, local_path, compress=False):
+        """Pull the contents of a directory from the system."""
+
     @abstractmethod
     def push_file(self, local_path, remote_path=None, count=1):
         """Push a file to the system."""
 
+    @abstractmethod
+    def push_tree(self, local_path, remote_path=None, compress=False):
+        """Push the contents of a local directory to the system."""
+
+    @abstractmethod
+    def read_file(self, path):
+        """Return the contents of a file."""
+        return
+
     @abstractmethod
     def remove(self, path):
         """Remove file or directory."""
 
+    def remove_many(self, paths):
+        """Remove files or directories and return the paths removed."""
+        removed = []
+        for path in paths:
+            if self.file_exists(path) or self.dir_exists(path):
+                self.remove(path)
+                removed.append(path)
+        return removed
+
+    def wipe_dirs(self, roots):
+        """Remove the contents of directories and return the paths removed."""
+        paths = []
+        for root in roots:
+            if self.dir_exists(root):
+                paths.extend('/'.join([root, item]) for item in self.list_items(root))
+        return self.remove_many(paths)
+
 
 class GaiaDeviceFileManager(GaiaFileManager):
     """File manager for Gaia instance running on a B2G device or emulator."""
 
+    # Pushed files are also kept here, named by their SHA-1, so files pushed
+    # again after the storage is cleaned up are copied on the device instead
+    cache_path = '/data/local/tmp/gaiatest-cache'
+
+    # the cache is emptied before adding a file once it holds this many
+    cache_size = 32
+
+    # SHA-1 of local files, by path, size and modification time
+    _hashes = {}
+
+    # adb truncates longer shell commands on older devices
+    max_command_length = 1024
+
     def copy_file(self, source, destination):
         self._logger.debug('Copying: %s to: %s' % (source, destination))
         self.device.manager.copyTree(source, destination)
@@ -78,6 +130,16 @@ class GaiaDeviceFileManager(GaiaFileManager):
         self._logger.debug('Checking for existance of directory: %s' % path)
         return self.device.manager.dirExists(path)
 
+    def duplicate_file(self, path, count):
+        # toolbox has no cp, so copy with dd in a single shell invocation
+        self._logger.debug('Duplicating: %s %d times' % (path, count))
+        prefix, suffix = self._duplicate_template(path)
+        script = ('i=1; while [ $i -le %d ]; do dd if=%s of=%s$i%s || exit 1; '
+                  'i=$((i+1)); done; rm %s') % (
+            count, pipes.quote(path), pipes.quote(prefix), pipes.quote(suffix),
+            pipes.quote(path))
+        self.device.manager.shellCheckOutput(['sh', '-c', script])
+
     def file_exists(self, path):
         self._logger.debug('Checking for existance of file: %s' % path)
         return self.device.manager.fileExists(path)
@@ -95,14 +157,147 @@ class GaiaDeviceFileManager(GaiaFileManager):
         filename = local_path.rpartition(os.path.sep)[-1]
         remote_file = '/'.join([remote_path, filename])
         self.make_dirs(remote_file)
-        self.device.manager.pushFile(local_path, remote_file)
+        if not self._copy_from_cache(local_path, remote_file):
+            self.device.manager.pushFile(local_path, remote_file)
+            self._add_to_cache(local_path, remote_file)
         if count > 1:
             self.duplicate_file(remote_file, count)
 
+    @property
+    def has_tar(self):
+        if not hasattr(self, '_has_tar'):
+            self._has_tar = 'tar' in self.device.manager.shellCheckOutput(
+                ['sh', '-c', 'if type tar >/dev/null 2>&1; then echo tar; fi'])
+        return self._has_tar
+
+    def _archive_path(self, remote_path, compress):
+        # next to the tree rather than in it, so it is not archived itself
+        return '%s.gaiatest.tar%s' % (remote_path.rstrip('/'), '.gz' if compress else '')
+
+    def push_tree(self, local_path, remote_path=None, compress=False):
+        remote_path = remote_path or self.device.storage_path
+        self.device.manager.shellCheckOutput(['mkdir', '-p', remote_path])
+        if not self.has_tar:
+            self._logger.debug('Pushing: %s to: %s' % (local_path, remote_path))
+            self.device.manager.pushDir(local_path, remote_path)
+            return
+
+        archive = tempfile.NamedTemporaryFile(suffix='.tar')
+        try:
+            self._logger.debug('Archiving: %s' % local_path)
+            with tarfile.open(fileobj=archive, mode='w:gz' if compress else 'w') as tar:
+                tar.add(local_path, arcname='.')
+            archive.flush()
+            remote_archive = self._archive_path(remote_path, compress)
+            self._logger.debug('Pushing: %s to: %s' % (local_path, remote_path))
+            self.device.manager.pushFile(archive.name, remote_archive)
+            self.device.manager.shellCheckOutput(['sh', '-c', (
+                'cd %(remote)s && tar -x%(z)sf %(archive)s; status=$?; '
+                'rm %(archive)s; exit $status') % {
+                    'remote': pipes.quote(remote_path),
+                    'archive': pipes.quote(remote_archive),
+                    'z': 'z' if compress else ''}])
+        finally:
+            archive.close()
+
+    def pull_tree(self, remote_path, local_path, compress=False):
+        if not os.path.isdir(local_path):
+            os.makedirs(local_path)
+        if not self.has_tar:
+            self._logger.debug('Pulling: %s to: %s' % (remote_path, local_path))
+            self.device.manager.getDirectory(remote_path, local_path)
+            return
+
+        remote_archive = self._archive_path(remote_path, compress)
+        self.device.manager.shellCheckOutput(['sh', '-c', (
+            'cd %(remote)s && tar -c%(z)sf %(archive)s .') % {
+                'remote': pipes.quote(remote_path),
+                'archive': pipes.quote(remote_archive),
+                'z': 'z' if compress else ''}])
+        archive = tempfile.NamedTemporaryFile(suffix='.tar')
+        try:
+            self._logger.debug('Pulling: %s to: %s' % (remote_path, local_path))
+            self.device.manager.getFile(remote_archive, archive.name)
+            with tarfile.open(archive.name) as tar:
+                tar.extractall(local_path)
+        finally:
+            archive.close()
+            self.device.manager.removeFile(remote_archive)
+
+    def _cached_path(self, local_path):
+        stat = os.stat(local_path)
+        key = (os.path.abspath(local_path), stat.st_size, stat.st_mtime)
+        if key not in self._hashes:
+            sha1 = hashlib.sha1()
+            with open(local_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), ''):
+                    sha1.update(chunk)
+            self._hashes[key] = sha1.hexdigest()
+        return '/'.join([self.cache_path, self._hashes[key]])
+
+    def _copy_from_cache(self, local_path, remote_file):
+        """Copy a previously pushed file on the device, returning success."""
+        cached = self._cached_path(local_path)
+        output = self.device.manager.shellCheckOutput(['sh', '-c', (
+            'if [ -f %(cached)s ]; then dd if=%(cached)s of=%(remote)s 2>/dev/null '
+            '&& echo cached; fi') % {'cached': pipes.quote(cached),
+                                     'remote': pipes.quote(remote_file)}])
+        if 'cached' in output:
+            self._logger.debug('Copied: %s to: %s from the push cache' % (local_path, remote_file))
+            return True
+        return False
+
+    def _add_to_cache(self, local_path, remote_file):
+        cached = self._cached_path(local_path)
+        self.make_dirs(cached)
+        # copy to a temporary name so an interrupted copy is never used
+        self.device.manager.shellCheckOutput(['sh', '-c', (
+            'set -- %(cache)s/*; if [ $# -ge %(size)d ]; then rm -f %(cache)s/*; fi; '
+            'dd if=%(remote)s of=%(cached)s.part 2>/dev/null && '
+            'mv %(cached)s.part %(cached)s') % {'cache': pipes.quote(self.cache_path),
+                                                'size': self.cache_size,
+                                                'cached': pipes.quote(cached),
+                                                'remote': pipes.quote(remote_file)}])
+
+    def read_file(self, path):
+        self._logger.debug('Reading: %s' % path)
+        return self.device.manager.pullFile(path)
+
     def remove(self, path):
         self._logger.debug('Removing: %s' % path)
         self.device.manager.removeDir(path)
 
+    def _shell_path(self, path):
+        # quote the path but leave wildcards to be expanded by the shell
+        return '*'.join(pipes.quote(part) if part else '' for part in path.split('*'))
+
+    def _remove_in_shell(self, words):
+        template = 'for p in %s; do if [ -e "$p" ]; then rm -r "$p" && echo "$p"; fi; done'
+        removed = []
+        chunk = []
+        for word in words + [None]:
+            # send the chunk when the next word would make the command too long
+            if chunk and (word is None or len(template % ' '.join(chunk + [word])) >
+                          self.max_command_length):
+                output = self.device.manager.shellCheckOutput(
+                    ['sh', '-c', template % ' '.join(chunk)])
+                removed.extend(line.strip() for line in output.splitlines() if line.strip())
+                chunk = []
+            if word is not None:
+                chunk.append(word)
+        self._logger.debug('Removed: %s' % ', '.join(removed))
+        return removed
+
+    def remove_many(self, paths):
+        # paths may contain * wildcards, which are expanded on the device
+        return self._remove_in_shell([self._shell_path(path) for path in paths])
+
+    def wipe_dirs(self, roots):
+        # * does not match hidden files, and .* would match . and ..
+        return self._remove_in_shell(['%s/%s' % (self._shell_path(root), pattern)
+                                      for root in roots
+                                      for pattern in ['*', '.[!.]*', '..?*']])
+
 
 class GaiaLocalFileManager(GaiaFileManager):
     """File manager for Gaia instance running locally such as desktop B2G."""
@@ -153,6 +348,32 @@ class GaiaLocalFileManager(GaiaFileManager):
         if count > 1:
             self.duplicate_file(remote_file, count)
 
+    def _copy_tree(self, source, destination):
+        # unlike shutil.copytree the destination may already exist
+        for root, dirs, files in os.walk(source):
+            target = os.path.join(destination, os.path.relpath(root, source))
+            if not os.path.isdir(target):
+                os.makedirs(target)
+            for filename in files:
+                shutil.copy2(os.path.join(root, filename), target)
+
+    def pull_tree(self, remote_path, local_path, compress=False):
+        # there is nothing to gain from archiving a local copy
+        remote_path = os.path.normpath(remote_path)
+        self._logger.debug('Pulling: %s to: %s' % (remote_path, local_path))
+        self._copy_tree(remote_path, local_path)
+
+    def push_tree(self, local_path, remote_path=None, compress=False):
+        remote_path = os.path.normpath(remote_path or self.device.storage_path)
+        self._logger.debug('Pushing: %s to: %s' % (local_path, remote_path))
+        self._copy_tree(local_path, remote_path)
+
+    def read_file(self, path):
+        path = os.path.normpath(path)
+        self._logger.debug('Reading: %s' % path)
+        with open(path) as f:
+            return f.read()
+
     def remove(self, path):
         path = os.path.normpath(path)
         if os.path.isfile(path):
@@ -161,3 +382,18 @@ class GaiaLocalFileManager(GaiaFileManager):
         elif os.path.isdir(path):
             self._logger.debug('Removing directory: %s' % path)
             shutil.rmtree(path)
+
+    def remove_many(self, paths):
+        paths = [path for path in paths if os.path.exists(os.path.normpath(path))]
+        if paths:
+            pool = ThreadPool(min(len(paths), 8))
+            try:
+                pool.map(self.remove, paths)
+            finally:
+                pool.close()
+        return paths
+
+    def wipe_dirs(self, roots):
+        # unlike glob, listdir includes hidden files
+        return self.remove_many([os.path.join(root, item) for root in roots
+                                 if os.path.isdir(root) for item in os.listdir(root)])
@@ -2,12 +2,17 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import atexit
+from contextlib import contextmanager
+import hashlib
 import json
 import os
+import re
 import shutil
 import tempfile
 import time
 
+import mozlog
 from marionette import (MarionetteTestCase,
                         EnduranceTestCaseMixin,
                         B2GTestCaseMixin,
@@ -17,17 +22,23 @@ try:
     from marionette.by import By
     from marionette.errors import (NoSuchElementException,
                                    StaleElementException,
-                                   InvalidResponseException)
+                                   InvalidResponseException,
+                                   TimeoutException)
     from marionette.wait import Wait
 except:
     from marionette_driver import expected
     from marionette_driver.by import By
     from marionette_driver.errors import (NoSuchElementException,
                                    StaleElementException,
-                                   InvalidResponseException)
+                                   InvalidResponseException,
+                                   TimeoutException)
     from marionette_driver.wait import Wait
 
+from client_state import MarionetteClientState
+from command_profiler import MarionetteCommandProfiler
 from file_manager import GaiaDeviceFileManager, GaiaLocalFileManager
+from reference_workload import ReferenceWorkload
+from sleep_profiler import SleepProfiler
 
 
 class GaiaApp(object):
@@ -43,12 +54,68 @@ class GaiaApp(object):
         return self.__dict__ == other.__dict__
 
 
+class GaiaAtoms(object):
+    """Imports JS atoms into Marionette once per session and context.
+
+    Marionette keeps imported scripts for the lifetime of a session, so page
+    objects constructing GaiaApps, GaiaData, etc. do not need to ship the same
+    atom source again. Only the atoms of the current session are remembered,
+    by (context, atom hash), so a new session or a B2G restart imports the
+    atoms again.
+    """
+
+    # imported atoms, by Marionette session id
+    _imported = {}
+    _hashes = {}
+    imports_avoided = 0
+
+    def __init__(self, marionette):
+        self.marionette = marionette
+
+    @staticmethod
+    def path(name):
+        return os.path.abspath(os.path.join(__file__, os.path.pardir, 'atoms', name))
+
+    def import_script(self, name, context=None):
+        """Import the named atom unless it is already in this session.
+
+        Atoms for the chrome context are imported from the content context,
+        which is restored afterwards.
+        """
+        context = context or self.marionette.CONTEXT_CONTENT
+        js = self.path(name)
+        if js not in GaiaAtoms._hashes:
+            with open(js, 'rb') as f:
+                GaiaAtoms._hashes[js] = hashlib.sha1(f.read()).hexdigest()
+        imported = GaiaAtoms._imported.get(self.marionette.session_id)
+        if imported is None:
+            imported = set()
+            GaiaAtoms._imported = {self.marionette.session_id: imported}
+        key = (context, GaiaAtoms._hashes[js])
+        if key in imported:
+            GaiaAtoms.imports_avoided += 1
+            return
+        if context == self.marionette.CONTEXT_CHROME:
+            self.marionette.set_context(self.marionette.CONTEXT_CHROME)
+            self.marionette.import_script(js)
+            self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        else:
+            self.marionette.import_script(js)
+        imported.add(key)
+
+    def forget_session(self):
+        """Forget the atoms imported into the current session."""
+        GaiaAtoms._imported = {}
+
+
 class GaiaApps(object):
 
+    # installed apps and the generation they were read at, by Marionette session id
+    _registries = {}
+
     def __init__(self, marionette):
         self.marionette = marionette
-        js = os.path.abspath(os.path.join(__file__, os.path.pardir, 'atoms', "gaia_apps.js"))
-        self.marionette.import_script(js)
+        GaiaAtoms(self.marionette).import_script('gaia_apps.js')
 
     def get_permission(self, app_name, permission_name):
         self.marionette.switch_to_frame()
@@ -68,11 +135,18 @@ class GaiaApps(object):
         self.marionette.switch_to_frame()
 
         if manifest_url:
-            result = self.marionette.execute_async_script("GaiaApps.launchWithManifestURL('%s', %s)"
-                                                          % (manifest_url, json.dumps(entry_point)), script_timeout=launch_timeout)
+            result = self._launch_with_manifest_url(manifest_url, entry_point, launch_timeout)
             assert result, "Failed to launch app with manifest_url '%s'" % manifest_url
         else:
-            result = self.marionette.execute_async_script("GaiaApps.launchWithName('%s')" % name, script_timeout=launch_timeout)
+            result = None
+            # only check the registry is current if the app is missing or fails to launch
+            for check in [False, True]:
+                registered_app = self.find_app(name, check=check)
+                if registered_app:
+                    result = self._launch_with_manifest_url(
+                        registered_app['manifestURL'], registered_app['entryPoint'], launch_timeout)
+                    if result:
+                        break
             assert result, "Failed to launch app with name '%s'" % name
         app = GaiaApp(frame=result.get('frame'),
                       src=result.get('src'),
@@ -84,6 +158,35 @@ class GaiaApps(object):
             self.marionette.switch_to_frame(app.frame_id)
         return app
 
+    def _launch_with_manifest_url(self, manifest_url, entry_point, launch_timeout):
+        return self.marionette.execute_async_script("GaiaApps.launchWithManifestURL('%s', %s)"
+                                                    % (manifest_url, json.dumps(entry_point)), script_timeout=launch_timeout)
+
+    def registry(self, check=True):
+        """Returns the installed apps, with one entry for each entry point.
+
+        The apps are read once per session and read again only when an app
+        has been installed or uninstalled since. With check set to False the
+        cached apps are returned without sending any command.
+        """
+        registry = self._registries.get(self.marionette.session_id)
+        if registry and not check:
+            return registry['apps']
+        self.marionette.switch_to_frame()
+        result = self.marionette.execute_script('return GaiaApps.getAppRegistry(%s);' % json.dumps(
+            registry and registry['generation']))
+        if result['apps'] is not None:
+            GaiaApps._registries = {self.marionette.session_id: result}
+            registry = result
+        return registry['apps']
+
+    def find_app(self, name, check=True):
+        """Returns the registry entry of the app with the given name, or None."""
+        normalized_name = re.sub('[- ]+', '', name).lower()
+        for registered_app in self.registry(check):
+            if normalized_name in registered_app['names']:
+                return registered_app
+
     @property
     def displayed_app(self):
         self.marionette.switch_to_frame()
@@ -93,13 +196,59 @@ class GaiaApps(object):
                        name=result.get('name'),
                        origin=result.get('origin'))
 
-    def switch_to_displayed_app(self):
+    def watch_transitions(self):
+        """Start recording app transitions on the device, if not already.
+
+        Recording also starts the first time transitions are read.
+        """
+        self.marionette.switch_to_frame()
+        self.marionette.execute_script('GaiaApps.watchTransitions();')
+
+    @property
+    def transitions(self):
+        """Returns the most recent app transitions, oldest first.
+
+        Each transition has the event type, the app name and origin and the
+        time in milliseconds. Transitions that opened an app also have the
+        duration in milliseconds since the app started to open.
+        """
+        self.marionette.switch_to_frame()
+        return self.marionette.execute_script('return GaiaApps.getTransitions();')
+
+    def wait_for_displayed_app(self, name, timeout=None, ignore_case=False):
+        """Waits for the app with the given name to be displayed and returns it.
+
+        The device checks the displayed app whenever an app is opened, so the
+        wait is a single async script. Leaves the client in the system frame.
+        """
+        timeout = timeout or (self.marionette.timeout or 10000) / 1000.0
+        self.marionette.switch_to_frame()
+        result = self.marionette.execute_async_script(
+            'GaiaApps.waitForDisplayedApp(%s, %d, %s);' % (
+                json.dumps(name), timeout * 1000, json.dumps(ignore_case)),
+            script_timeout=int(timeout * 1000) + 5000)
+        if result.get('timeout'):
+            raise TimeoutException(
+                "Timed out after %s seconds waiting for app '%s' to be displayed" % (timeout, name))
+        return GaiaApp(frame=result.get('frame'),
+                       src=result.get('src'),
+                       name=result.get('name'),
+                       origin=result.get('origin'))
+
+    def switch_to_displayed_app(self, name=None, timeout=None, ignore_case=False):
+        """Switches to the frame of the displayed app.
+
+        If a name is given, first waits for the app with that name to be displayed.
+        """
         self.marionette.switch_to_default_content()
-        self.marionette.switch_to_frame(self.displayed_app.frame)
+        if name is None:
+            app = self.displayed_app
+        else:
+            app = self.wait_for_displayed_app(name, timeout, ignore_case)
+        self.marionette.switch_to_frame(app.frame)
 
     def is_app_installed(self, app_name):
-        self.marionette.switch_to_frame()
-        return self.marionette.execute_async_script("GaiaApps.locateWithName('%s')" % app_name)
+        return self.find_app(app_name) is not None
 
     def kill(self, app):
         self.marionette.switch_to_frame()
@@ -107,33 +256,15 @@ class GaiaApps(object):
         assert result, "Failed to kill app with name '%s'" % app.name
 
     def kill_all(self):
-        # First we attempt to kill the FTU, we treat it as a user app
-        for app in self.running_apps(include_system_apps=True):
-            if app.origin == 'app://ftu.gaiamobile.org':
-                self.kill(app)
-                break
-
-        # Now kill the user apps
+        """Kills the FTU and the user apps, and returns the killed apps."""
         self.marionette.switch_to_frame()
-        self.marionette.execute_async_script("GaiaApps.killAll();")
+        killed = self.marionette.execute_async_script("GaiaApps.killAll();")
+        return [GaiaApp(origin=app['origin'], name=app['name']) for app in killed]
 
     @property
     def installed_apps(self):
-        apps = self.marionette.execute_async_script(
-            'return GaiaApps.getInstalledApps();')
-        result = []
-        for app in [a for a in apps if not a['manifest'].get('role')]:
-            entry_points = app['manifest'].get('entry_points')
-            if entry_points:
-                for ep in entry_points.values():
-                    result.append(GaiaApp(
-                        origin=app['origin'],
-                        name=ep['name']))
-            else:
-                result.append(GaiaApp(
-                    origin=app['origin'],
-                    name=app['manifest']['name']))
-        return result
+        return [GaiaApp(origin=app['origin'], name=app['name'])
+                for app in self.registry() if not app['role']]
 
     def running_apps(self, include_system_apps=False):
         '''  Returns a list of running apps
@@ -158,70 +289,104 @@ class GaiaData(object):
         self.apps = GaiaApps(marionette)
         self.marionette = marionette
         self.testvars = testvars or {}
-        js = os.path.abspath(os.path.join(__file__, os.path.pardir, 'atoms', "gaia_data_layer.js"))
-        self.marionette.import_script(js)
+        self._logger = mozlog.getLogger('GaiaData')
+        atoms = GaiaAtoms(self.marionette)
+        atoms.import_script('gaia_data_layer.js')
 
         # TODO Bugs 1043562/1049489 To perform ContactsAPI scripts from the chrome context, we need
         # to import the js file into chrome context too
+        atoms.import_script('gaia_data_layer.js', self.marionette.CONTEXT_CHROME)
+
+    @contextmanager
+    def chrome_context(self):
+        """Runs a group of operations in the chrome context.
+
+        The context is switched to chrome once for the whole group and back to
+        the context the caller was in when the outermost group exits, so nested
+        data layer calls do not switch back and forth.
+        """
+        previous = MarionetteClientState.install(self.marionette).current_context
+        if previous == self.marionette.CONTEXT_CHROME:
+            yield
+            return
         self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        self.marionette.import_script(js)
-        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        try:
+            yield
+        finally:
+            self.marionette.set_context(previous)
 
     def set_time(self, date_number):
-        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        self.marionette.execute_script("window.navigator.mozTime.set(%s);" % date_number)
-        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        with self.chrome_context():
+            self.marionette.execute_script("window.navigator.mozTime.set(%s);" % date_number)
 
     @property
     def all_contacts(self):
         # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
-        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        result = self.marionette.execute_async_script('return GaiaDataLayer.getAllContacts();', special_powers=True)
-        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
-        return result
+        with self.chrome_context():
+            return self.marionette.execute_async_script('return GaiaDataLayer.getAllContacts();', special_powers=True)
+
+    @property
+    def contacts_count(self):
+        # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
+        with self.chrome_context():
+            return self.marionette.execute_async_script('return GaiaDataLayer.getContactsCount();', special_powers=True)
 
     @property
     def sim_contacts(self):
         # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
-        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        adn_contacts = self.marionette.execute_async_script('return GaiaDataLayer.getSIMContacts("adn");', special_powers=True)
-        sdn_contacts = self.marionette.execute_async_script('return GaiaDataLayer.getSIMContacts("sdn");', special_powers=True)
-        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        with self.chrome_context():
+            adn_contacts = self.marionette.execute_async_script('return GaiaDataLayer.getSIMContacts("adn");', special_powers=True)
+            sdn_contacts = self.marionette.execute_async_script('return GaiaDataLayer.getSIMContacts("sdn");', special_powers=True)
         return adn_contacts + sdn_contacts
 
     def insert_contact(self, contact):
         # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
-        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        mozcontact = contact.create_mozcontact()
-        result = self.marionette.execute_async_script('return GaiaDataLayer.insertContact(%s);' % json.dumps(mozcontact), special_powers=True)
-        assert result, 'Unable to insert contact %s' % contact
-        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        with self.chrome_context():
+            mozcontact = contact.create_mozcontact()
+            result = self.marionette.execute_async_script('return GaiaDataLayer.insertContact(%s);' % json.dumps(mozcontact), special_powers=True)
+            assert result, 'Unable to insert contact %s' % contact
+
+    def insert_contacts(self, contacts, batch_size=100):
+        """Inserts contacts in batches of batch_size and returns their ids."""
+        contacts = list(contacts)
+        ids = []
+        start = time.time()
+        # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
+        with self.chrome_context():
+            for i in range(0, len(contacts), batch_size):
+                batch = [contact.create_mozcontact() for contact in contacts[i:i + batch_size]]
+                result = self.marionette.execute_async_script(
+                    'return GaiaDataLayer.insertContacts(%s);' % json.dumps(batch), special_powers=True,
+                    script_timeout=max(self.marionette.timeout or 60000, 1000 * len(batch)))
+                assert result, 'Unable to insert contacts %d to %d' % (i + 1, i + len(batch))
+                ids.extend(result)
+        duration = time.time() - start
+        self._logger.info('Inserted %d contacts in %.2fs (%.1f contacts/s)' % (
+            len(ids), duration, len(ids) / duration if duration else 0))
+        return ids
 
     def insert_sim_contact(self, contact, contact_type='adn'):
         # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
-        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        mozcontact = contact.create_mozcontact()
-        result = self.marionette.execute_async_script('return GaiaDataLayer.insertSIMContact("%s", %s);'
-                                                      % (contact_type, json.dumps(mozcontact)), special_powers=True)
-        assert result, 'Unable to insert SIM contact %s' % contact
-        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        with self.chrome_context():
+            mozcontact = contact.create_mozcontact()
+            result = self.marionette.execute_async_script('return GaiaDataLayer.insertSIMContact("%s", %s);'
+                                                          % (contact_type, json.dumps(mozcontact)), special_powers=True)
+            assert result, 'Unable to insert SIM contact %s' % contact
         return result
 
     def delete_sim_contact(self, moz_contact_id, contact_type='adn'):
         # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
-        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        result = self.marionette.execute_async_script('return GaiaDataLayer.deleteSIMContact("%s", "%s");'
-                                                      % (contact_type, moz_contact_id), special_powers=True)
-        assert result, 'Unable to insert SIM contact %s' % moz_contact_id
-        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        with self.chrome_context():
+            result = self.marionette.execute_async_script('return GaiaDataLayer.deleteSIMContact("%s", "%s");'
+                                                          % (contact_type, moz_contact_id), special_powers=True)
+            assert result, 'Unable to insert SIM contact %s' % moz_contact_id
 
     def remove_all_contacts(self):
         # TODO Bug 1049489 - In future, simplify executing scripts from the chrome context
-        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        timeout = max(self.marionette.timeout or 60000, 1000 * len(self.all_contacts))
-        result = self.marionette.execute_async_script('return GaiaDataLayer.removeAllContacts();', special_powers=True, script_timeout=timeout)
-        assert result, 'Unable to remove all contacts'
-        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+        with self.chrome_context():
+            timeout = max(self.marionette.timeout or 60000, 1000 * len(self.all_contacts))
+            result = self.marionette.execute_async_script('return GaiaDataLayer.removeAllContacts();', special_powers=True, script_timeout=timeout)
+            assert result, 'Unable to remove all contacts'
 
     def get_setting(self, name):
         return self.marionette.execute_async_script('return GaiaDataLayer.getSetting("%s")' % name, special_powers=True)
@@ -236,6 +401,14 @@ class GaiaData(object):
         result = self.marionette.execute_async_script('return GaiaDataLayer.setSetting("%s", %s)' % (name, value), special_powers=True)
         assert result, "Unable to change setting with name '%s' to '%s'" % (name, value)
 
+    def set_settings(self, settings):
+        """Changes several settings in a single settings transaction."""
+        if not settings:
+            return
+        result = self.marionette.execute_async_script(
+            'return GaiaDataLayer.setSettings(%s)' % json.dumps(settings), special_powers=True)
+        assert result, "Unable to change settings to '%s'" % settings
+
     def _get_pref(self, datatype, name):
         self.marionette.switch_to_frame()
         pref = self.marionette.execute_script("return SpecialPowers.get%sPref('%s');" % (datatype, name), special_powers=True)
@@ -272,8 +445,7 @@ class GaiaData(object):
 
     def set_volume(self, value):
         channels = ['alarm', 'content', 'notification']
-        for channel in channels:
-            self.set_setting('audio.volume.%s' % channel, value)
+        self.set_settings(dict(('audio.volume.%s' % channel, value) for channel in channels))
 
     def bluetooth_enable(self):
         self.marionette.switch_to_frame()
@@ -455,9 +627,7 @@ class Accessibility(object):
 
     def __init__(self, marionette):
         self.marionette = marionette
-        js = os.path.abspath(os.path.join(__file__, os.path.pardir,
-                                          'atoms', "accessibility.js"))
-        self.marionette.import_script(js)
+        GaiaAtoms(self.marionette).import_script('accessibility.js')
 
     def is_hidden(self, element):
         return self._run_async_script('isHidden', [element])
@@ -500,22 +670,141 @@ class Accessibility(object):
         return result.get('result', None)
 
 
+class GaiaWait(object):
+    """Waits that are evaluated on the device in a single async script.
+
+    The condition is checked on every DOM mutation and animation frame of the
+    current frame, so a wait costs one round trip and returns within
+    milliseconds of the condition becoming true. Element waits take a CSS
+    selector and raise TimeoutException like marionette's Wait.
+    """
+
+    def __init__(self, marionette, timeout=None):
+        self.marionette = marionette
+        self.timeout = timeout or (self.marionette.timeout or 10000) / 1000.0
+        GaiaAtoms(self.marionette).import_script('gaia_wait.js')
+
+    def until(self, condition, message=None):
+        """Waits for the JS function body condition to return a truthy value and returns it."""
+        return self._wait('GaiaWait.until(function() { %s }, %d);' % (
+            condition, self.timeout * 1000), message)
+
+    def for_element_present(self, selector):
+        return self._wait_for_selector(selector, 'present')
+
+    def for_element_displayed(self, selector):
+        # displayedness is judged from the layout and computed style, which
+        # is not always what marionette's is_displayed reports
+        return self._wait_for_selector(selector, 'displayed')
+
+    def for_element_not_present(self, selector):
+        self._wait_for_selector(selector, 'absent')
+
+    def for_element_not_displayed(self, selector):
+        self._wait_for_selector(selector, 'hidden')
+
+    def for_idle(self, selector=None, quiet_ms=200):
+        """Waits for the element, or the whole frame, to be present and stop changing for quiet_ms."""
+        self._wait('GaiaWait.forIdle(%s, %d, %d);' % (
+            json.dumps(selector), quiet_ms, self.timeout * 1000),
+            "Timed out waiting for '%s' to be present and idle for %dms" % (
+                selector or 'the frame', quiet_ms))
+
+    def _wait_for_selector(self, selector, state):
+        return self._wait('GaiaWait.forSelector(%s, "%s", %d);' % (
+            json.dumps(selector), state, self.timeout * 1000),
+            "Timed out waiting for element '%s' to be %s" % (selector, state))
+
+    def _wait(self, script, message):
+        result = self.marionette.execute_async_script(
+            script, script_timeout=int(self.timeout * 1000) + 5000)
+        if result.get('timeout'):
+            raise TimeoutException(
+                message or 'Timed out after %s seconds' % self.timeout)
+        return result.get('value')
+
+
+class GaiaScripts(object):
+    """Runs named scripts whose body is only sent when it is not registered.
+
+    The first time a script runs in a session its body is registered in the
+    current window along with the call, and later calls in the session only
+    send the name and arguments. As the session is started again for every
+    test, each body is still sent at least once per test, and again whenever
+    the window has been reloaded and the call finds no script. Changing the
+    body of a script registers it under a new name.
+    """
+
+    unregistered = {'gaiatestUnregistered': True}
+
+    # names of the scripts registered, by Marionette session id
+    _registered = {}
+
+    def __init__(self, marionette):
+        self.marionette = marionette
+        GaiaAtoms(self.marionette).import_script('gaia_scripts.js')
+
+    def execute_script(self, name, body, script_args=None, **kwargs):
+        return self._execute(self.marionette.execute_script, name, body,
+                             'return GaiaScripts.call(%s, arguments);',
+                             script_args, kwargs)
+
+    def execute_async_script(self, name, body, script_args=None, **kwargs):
+        return self._execute(self.marionette.execute_async_script, name, body,
+                             'if (GaiaScripts.call(%s, arguments) === GaiaScripts.unregistered) {\n'
+                             '  marionetteScriptFinished(GaiaScripts.unregistered);\n'
+                             '}', script_args, kwargs)
+
+    def _execute(self, execute, name, body, call, script_args, kwargs):
+        key = json.dumps('%s-%s' % (name, hashlib.sha1(body).hexdigest()[:8]))
+        call = call % key
+        script_args = script_args or []
+        registered = self._registered.get(self.marionette.session_id, set())
+        if key in registered:
+            result = execute(call, script_args=script_args, **kwargs)
+            if result != self.unregistered:
+                return result
+        result = execute('GaiaScripts.register(%s, %s);\n%s' % (key, self._factory(body), call),
+                         script_args=script_args, **kwargs)
+        GaiaScripts._registered = {self.marionette.session_id: registered | set([key])}
+        return result
+
+    @staticmethod
+    def _factory(body):
+        return '\n'.join([
+            'function(aHelpers, aArgs) {',
+            '  var marionetteScriptFinished = aHelpers.marionetteScriptFinished;',
+            '  var waitFor = aHelpers.waitFor;',
+            '  var SpecialPowers = aHelpers.SpecialPowers;',
+            '  return (function() {\n%s\n}).apply(null, aArgs);' % body,
+            '}'])
+
+
 class FakeUpdateChecker(object):
 
     def __init__(self, marionette):
         self.marionette = marionette
-        self.fakeupdatechecker_atom = os.path.abspath(
-            os.path.join(__file__, os.path.pardir, 'atoms', "fake_update-checker.js"))
 
     def check_updates(self):
+        GaiaAtoms(self.marionette).import_script(
+            'fake_update-checker.js', self.marionette.CONTEXT_CHROME)
         self.marionette.set_context(self.marionette.CONTEXT_CHROME)
-        self.marionette.import_script(self.fakeupdatechecker_atom)
         self.marionette.execute_script("GaiaUITests_FakeUpdateChecker();")
         self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
 
 
 class GaiaDevice(object):
 
+    # profile captured after the first boot of desktop B2G
+    golden_profile = None
+
+    # state left behind by a full reset, until B2G is stopped or started
+    gaia_baseline = None
+
+    # known wifi networks are saved here, and only listed by the wifi
+    # manager while wifi is enabled
+    wifi_config_path = '/data/misc/wifi/wpa_supplicant.conf'
+
     def __init__(self, marionette, testvars=None, manager=None):
         self.manager = manager
         self.marionette = marionette
@@ -531,9 +820,6 @@ class GaiaDevice(object):
             # Use the device root for storage
             self.storage_path = self.manager.deviceRoot
 
-        self.lockscreen_atom = os.path.abspath(
-            os.path.join(__file__, os.path.pardir, 'atoms', "gaia_lock_screen.js"))
-
     def _set_storage_path(self):
         if self.is_desktop_b2g:
             # Override the storage location for desktop B2G. This will only
@@ -588,6 +874,7 @@ class GaiaDevice(object):
             self.manager.shellCheckOutput(['start', 'b2g'])
         else:
             raise Exception('Unable to start B2G')
+        GaiaDevice.gaia_baseline = None
         self.marionette.wait_for_port()
         self.marionette.start_session()
 
@@ -602,13 +889,72 @@ class GaiaDevice(object):
             By.CSS_SELECTOR, '#homescreen[loading-state=false]'))
 
         # Wait for logo to be hidden
-        self.marionette.set_search_timeout(0)
-        try:
-            Wait(self.marionette, timeout, ignored_exceptions=StaleElementException).until(
-                lambda m: not m.find_element(By.ID, 'os-logo').is_displayed())
-        except NoSuchElementException:
-            pass
-        self.marionette.set_search_timeout(self.marionette.timeout or 10000)
+        with MarionetteClientState.install(self.marionette).no_implicit_wait():
+            try:
+                Wait(self.marionette, timeout, ignored_exceptions=StaleElementException).until(
+                    lambda m: not m.find_element(By.ID, 'os-logo').is_displayed())
+            except NoSuchElementException:
+                pass
+
+    def capture_golden_profile(self, timeout=120):
+        """Capture the profile of the desktop B2G instance as the golden profile.
+
+        Once B2G has finished booting it is stopped and its profile is copied.
+        The instance then starts from a clone of this copy, so restarts skip
+        building the profile from scratch and the golden profile is never
+        modified.
+        """
+        self.wait_for_b2g_ready(timeout)
+        path = tempfile.mkdtemp()
+        atexit.register(shutil.rmtree, path, ignore_errors=True)
+        GaiaDevice.golden_profile = self._copy_profile(os.path.join(path, 'profile'))
+        self.marionette.instance.profile_path = GaiaDevice.golden_profile
+
+    def _copy_profile(self, destination):
+        runner = self.marionette.instance.runner
+        # stop the process so the profile is not copied mid-write
+        runner.stop()
+        shutil.copytree(runner.profile.profile, destination,
+                        ignore=shutil.ignore_patterns('lock', 'parent.lock', '.parentlock'))
+        return destination
+
+    def load_reference_workload(self, **counts):
+        """Restart B2G with the databases of the reference workload.
+
+        The counts select the prebuilt databases in
+        test_media/reference-workload, such as contacts=500 or sms=1000. For
+        desktop B2G the databases are pushed into a copy of the profile that
+        the instance is restarted from.
+        """
+        path = self.testvars.get('reference_workload_path')
+        if self.marionette.instance and self.is_desktop_b2g:
+            instance = self.marionette.instance
+            profile_path = instance.profile_path
+            staging = tempfile.mkdtemp()
+            try:
+                profile = self._copy_profile(os.path.join(staging, 'profile'))
+                ReferenceWorkload(GaiaLocalFileManager(self), path).load(profile, **counts)
+                instance.profile_path = profile
+                self.stop_b2g()
+                self.start_b2g()
+            finally:
+                # the instance runs from its own clone of the profile
+                instance.profile_path = profile_path
+                shutil.rmtree(staging, ignore_errors=True)
+        elif self.is_android_build:
+            self.stop_b2g()
+            ReferenceWorkload(self.file_manager, path).load('/data/local', **counts)
+            self.start_b2g()
+        else:
+            raise Exception('Unable to load the reference workload')
+
+    @property
+    def saved_wifi_networks(self):
+        """Returns the SSIDs of the saved wifi networks, without enabling wifi."""
+        if not self.file_manager.file_exists(self.wifi_config_path):
+            return []
+        return re.findall(r'^\s*ssid="(.*)"\s*$',
+                          self.file_manager.read_file(self.wifi_config_path), re.M)
 
     @property
     def is_b2g_running(self):
@@ -625,6 +971,8 @@ class GaiaDevice(object):
                 message='b2g failed to stop.')
         else:
             raise Exception('Unable to stop B2G')
+        GaiaDevice.gaia_baseline = None
+        GaiaAtoms(self.marionette).forget_session()
         self.marionette.client.close()
         self.marionette.session = None
         self.marionette.window = None
@@ -636,7 +984,7 @@ class GaiaDevice(object):
             }));""")
 
     def press_release_volume_up_then_down_n_times(self, n_times):
-        self.marionette.execute_script("""
+        GaiaScripts(self.marionette).execute_script('press_release_volume', """
             function sendEvent(key, aType) {
               var type = aType === 'press' ? 'mozbrowserafterkeydown' : 'mozbrowserafterkeyup';
               window.wrappedJSObject.dispatchEvent(new KeyboardEvent(type, {
@@ -660,14 +1008,27 @@ class GaiaDevice(object):
     def is_screen_enabled(self):
         return self.marionette.execute_script('return window.wrappedJSObject.ScreenManager.screenEnabled')
 
+    def wait_for_idle(self, frame=None, selector=None, quiet_ms=200, timeout=None):
+        """Waits for an element of a frame to stop changing and animating.
+
+        The element matching the CSS selector is idle once quiet_ms have
+        passed without DOM mutations, transitions, animations or scrolling
+        within it. Without a selector the whole frame is watched, which
+        background activity such as the status bar can keep busy. frame is
+        an app frame element, or None for the system app. Leaves the client
+        in the frame.
+        """
+        self.marionette.switch_to_frame()
+        if frame is not None:
+            self.marionette.switch_to_frame(frame)
+        GaiaWait(self.marionette, timeout).for_idle(selector, quiet_ms)
+
     def touch_home_button(self):
         apps = GaiaApps(self.marionette)
         if apps.displayed_app.name.lower() != 'homescreen':
             # touching home button will return to homescreen
             self._dispatch_home_button_event()
-            Wait(self.marionette).until(
-                lambda m: apps.displayed_app.name.lower() == 'homescreen')
-            apps.switch_to_displayed_app()
+            apps.switch_to_displayed_app('homescreen', ignore_case=True)
         else:
             apps.switch_to_displayed_app()
             mode = self.marionette.find_element(By.TAG_NAME, 'body').get_attribute('class')
@@ -706,7 +1067,7 @@ class GaiaDevice(object):
         Wait(self.marionette).until(lambda m: m.find_element(By.CSS_SELECTOR, 'div.lockScreenWindow.active'))
 
     def unlock(self):
-        self.marionette.import_script(self.lockscreen_atom)
+        GaiaAtoms(self.marionette).import_script('gaia_lock_screen.js')
         self.marionette.switch_to_frame()
         result = self.marionette.execute_async_script('GaiaLockScreen.unlock()')
         assert result, 'Unable to unlock screen'
@@ -715,7 +1076,7 @@ class GaiaDevice(object):
         """  There are 4 orientation states which the phone can be passed in:
         portrait-primary(which is the default orientation), landscape-primary, portrait-secondary and landscape-secondary
         """
-        self.marionette.execute_async_script("""
+        GaiaScripts(self.marionette).execute_async_script('change_orientation', """
             if (arguments[0] === arguments[1]) {
               marionetteScriptFinished();
             }
@@ -747,24 +1108,44 @@ class GaiaDevice(object):
 
 
 class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
+
     def __init__(self, *args, **kwargs):
         self.restart = kwargs.pop('restart', False)
+        self.incremental_cleanup = kwargs.pop('incremental_cleanup', False)
+        self.golden_profile = kwargs.pop('golden_profile', False)
+        self.command_profile = kwargs.pop('command_profile', None)
+        self.sleep_profile = kwargs.pop('sleep_profile', None)
         MarionetteTestCase.__init__(self, *args, **kwargs)
         B2GTestCaseMixin.__init__(self, *args, **kwargs)
 
     def setUp(self):
+        if self.sleep_profile:
+            profiler = SleepProfiler.install()
+            profiler.start_test(self.id())
+            # cleanups also run when setUp raises, unlike tearDown
+            self.addCleanup(profiler.stop_test)
+
         try:
             MarionetteTestCase.setUp(self)
         except (InvalidResponseException, IOError):
             if self.restart:
                 pass
 
+        if self.command_profile:
+            MarionetteCommandProfiler.install(self.marionette).start_test(self.id())
+
+        # Skip switching to the frame or context we are already in
+        MarionetteClientState.install(self.marionette)
+
         self.device = GaiaDevice(self.marionette,
                                  manager=self.device_manager,
                                  testvars=self.testvars)
 
         if self.restart and (self.device.is_android_build or self.marionette.instance):
             # Restart if it's a device, or we have passed a binary instance with --binary command arg
+            if self.golden_profile and self.device.is_desktop_b2g and self.marionette.instance and \
+                    GaiaDevice.golden_profile is None:
+                self.device.capture_golden_profile()
             self.device.stop_b2g()
             if self.device.is_android_build:
                 self.cleanup_data()
@@ -774,6 +1155,24 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
         FakeUpdateChecker(self.marionette).check_updates()
 
         # We need to set the default timeouts because we may have a new session
+        self.set_timeouts()
+
+        self.apps = GaiaApps(self.marionette)
+        self.data_layer = GaiaData(self.marionette, self.testvars)
+        self.accessibility = Accessibility(self.marionette)
+
+        if self.incremental_cleanup and not self.restart:
+            self.cleanup_incrementally()
+            return
+
+        self.cleanup_storage()
+
+        if self.restart:
+            self.cleanup_gaia(full_reset=False)
+        else:
+            self.cleanup_gaia(full_reset=True)
+
+    def set_timeouts(self):
         if self.marionette.timeout is None:
             # if no timeout is passed in, we detect the hardware type and set reasonable defaults
             timeouts = {}
@@ -803,33 +1202,23 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
             self.marionette.timeouts(self.marionette.TIMEOUT_SCRIPT, self.marionette.timeout)
             self.marionette.timeouts(self.marionette.TIMEOUT_PAGE, self.marionette.timeout)
 
-        self.apps = GaiaApps(self.marionette)
-        self.data_layer = GaiaData(self.marionette, self.testvars)
-        self.accessibility = Accessibility(self.marionette)
-
-        self.cleanup_storage()
-
-        if self.restart:
-            self.cleanup_gaia(full_reset=False)
-        else:
-            self.cleanup_gaia(full_reset=True)
-
     def cleanup_data(self):
-        self.device.file_manager.remove('/cache/*')
-        self.device.file_manager.remove('/data/b2g/mozilla')
-        self.device.file_manager.remove('/data/local/debug_info_trigger')
-        self.device.file_manager.remove('/data/local/indexedDB')
-        self.device.file_manager.remove('/data/local/OfflineCache')
-        self.device.file_manager.remove('/data/local/permissions.sqlite')
-        self.device.file_manager.remove('/data/local/storage/permanent')
-        self.device.file_manager.remove('/data/local/storage/persistent')
-        self.device.file_manager.remove('/data/local/storage/default')
-        self.device.file_manager.remove('/data/local/webapps')
-        # remove remembered networks
-        self.device.file_manager.remove('/data/misc/wifi/wpa_supplicant.conf')
+        return self.device.file_manager.remove_many([
+            '/cache/*',
+            '/data/b2g/mozilla',
+            '/data/local/debug_info_trigger',
+            '/data/local/indexedDB',
+            '/data/local/OfflineCache',
+            '/data/local/permissions.sqlite',
+            '/data/local/storage/permanent',
+            '/data/local/storage/persistent',
+            '/data/local/storage/default',
+            '/data/local/webapps',
+            # remove remembered networks
+            '/data/misc/wifi/wpa_supplicant.conf'])
 
-    def cleanup_storage(self):
-        """Remove all files from the device's storage paths"""
+    @property
+    def storage_paths(self):
         storage_paths = [self.device.storage_path]
         if self.device.is_android_build:
             # TODO: Remove hard-coded paths once bug 1018079 is resolved
@@ -838,10 +1227,20 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
                                   '/storage/sdcard',
                                   '/storage/sdcard0',
                                   '/storage/sdcard1'])
-        for path in storage_paths:
+        return storage_paths
+
+    @property
+    def storage_items(self):
+        """Returns a dict of the items in each existing storage path"""
+        items = {}
+        for path in self.storage_paths:
             if self.device.file_manager.dir_exists(path):
-                for item in self.device.file_manager.list_items(path):
-                    self.device.file_manager.remove('/'.join([path, item]))
+                items[path] = self.device.file_manager.list_items(path)
+        return items
+
+    def cleanup_storage(self):
+        """Remove all files from the device's storage paths"""
+        return self.device.file_manager.wipe_dirs(self.storage_paths)
 
     def cleanup_gaia(self, full_reset=True):
         # unlock
@@ -852,33 +1251,32 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
         self.apps.kill_all()
 
         if full_reset:
-            # disable passcode
-            self.data_layer.set_setting('lockscreen.passcode-lock.code', '1111')
-            self.data_layer.set_setting('lockscreen.passcode-lock.enabled', False)
-
-            # change language back to english
-            self.data_layer.set_setting("language.current", "en-US")
-
-            # reset keyboard to default values
-            self.data_layer.set_setting("keyboard.enabled-layouts",
-                                        "{'app://keyboard.gaiamobile.org/manifest.webapp': {'en': True, 'number': True}}")
-
-            # reset do not track
-            self.data_layer.set_setting('privacy.donottrackheader.value', '-1')
+            settings = {
+                # disable passcode
+                'lockscreen.passcode-lock.code': '1111',
+                'lockscreen.passcode-lock.enabled': False,
+                # change language back to english
+                'language.current': 'en-US',
+                # reset keyboard to default values
+                'keyboard.enabled-layouts':
+                    "{'app://keyboard.gaiamobile.org/manifest.webapp': {'en': True, 'number': True}}",
+                # reset do not track
+                'privacy.donottrackheader.value': '-1',
+                # Re-set edge gestures pref to False
+                'edgesgesture.enabled': False,
+                # disable cell roaming
+                'ril.data.roaming_enabled': False}
 
             if self.data_layer.get_setting('airplaneMode.enabled'):
                 # enable the device radio, disable airplane mode
-                self.data_layer.set_setting('airplaneMode.enabled', False)
+                settings['airplaneMode.enabled'] = False
 
-            # Re-set edge gestures pref to False
-            self.data_layer.set_setting('edgesgesture.enabled', False)
+            self.data_layer.set_settings(settings)
 
             # disable carrier data connection
             if self.device.has_mobile_connection:
                 self.data_layer.disable_cell_data()
 
-            self.data_layer.disable_cell_roaming()
-
             if self.device.has_wifi:
                 # Bug 908553 - B2G Emulator: support wifi emulation
                 if not self.device.is_emulator:
@@ -895,16 +1293,20 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
         # disable sound completely
         self.data_layer.set_volume(0)
 
-        # disable search suggestions
-        self.data_layer.set_setting('search.suggestions.enabled', False)
-
-        # disable auto-correction of keyboard
-        self.data_layer.set_setting('keyboard.autocorrect', False)
+        settings = {
+            # disable search suggestions
+            'search.suggestions.enabled': False,
+            # disable auto-correction of keyboard
+            'keyboard.autocorrect': False}
 
         # restore settings from testvars
-        [self.data_layer.set_setting(name, value) for name, value in self.testvars.get('settings', {}).items()]
+        settings.update(self.testvars.get('settings', {}))
+        self.data_layer.set_settings(settings)
 
-        # restore prefs from testvars
+        self.restore_prefs()
+
+    def restore_prefs(self):
+        """Restore the prefs from testvars"""
         for name, value in self.testvars.get('prefs', {}).items():
             if type(value) is int:
                 self.data_layer.set_int_pref(name, value)
@@ -913,6 +1315,92 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
             else:
                 self.data_layer.set_char_pref(name, value)
 
+    @property
+    def gaia_state(self):
+        """Returns a snapshot of the state reset by cleanup_gaia and cleanup_storage"""
+        state = {
+            'settings': self.data_layer.all_settings,
+            'contacts_count': self.data_layer.contacts_count,
+            'known_networks': [],
+            'storage_items': self.storage_items}
+        if self.device.has_wifi and not self.device.is_emulator:
+            if self.data_layer.is_wifi_enabled:
+                networks = [n['ssid'] for n in self.data_layer.known_networks]
+            else:
+                # read the saved networks rather than turning wifi on
+                networks = self.device.saved_wifi_networks
+            state['known_networks'] = sorted(networks)
+        return state
+
+    def cleanup_incrementally(self):
+        """Undo only the changes made since the baseline state was captured.
+
+        The first call after B2G starts performs a full reset and captures the
+        resulting state as the baseline, which later tests share until B2G is
+        stopped or restarted. Later calls compare the current state with the
+        baseline and only reset the subsystems that differ.
+        """
+        baseline = GaiaDevice.gaia_baseline
+        if baseline is None:
+            self.cleanup_storage()
+            self.cleanup_gaia(full_reset=True)
+            GaiaDevice.gaia_baseline = self.gaia_state
+            return
+
+        # unlock
+        if self.data_layer.get_setting('lockscreen.enabled'):
+            self.device.unlock()
+
+        # kill the FTU and any open, user-killable apps
+        self.apps.kill_all()
+
+        state = self.gaia_state
+
+        self.device.file_manager.remove_many(
+            '/'.join([path, item]) for path, items in state['storage_items'].items()
+            for item in set(items) - set(baseline['storage_items'].get(path, [])))
+
+        settings = dict((name, value) for name, value in baseline['settings'].items()
+                        if state['settings'].get(name) != value)
+        # clear the settings created since the baseline
+        settings.update((name, None) for name in state['settings']
+                        if name not in baseline['settings'])
+        reset_cell_data = settings.pop('ril.data.enabled', None) is not None
+        reset_wifi = settings.pop('wifi.enabled', None) is not None or \
+            state['known_networks'] != baseline['known_networks']
+        self.data_layer.set_settings(settings)
+
+        if reset_cell_data and self.device.has_mobile_connection:
+            self.data_layer.disable_cell_data()
+
+        if reset_wifi and self.device.has_wifi and not self.device.is_emulator:
+            self.data_layer.enable_wifi()
+            self.data_layer.forget_all_networks()
+            self.data_layer.disable_wifi()
+
+        if state['contacts_count'] != baseline['contacts_count']:
+            self.data_layer.remove_all_contacts()
+
+        # reset to home screen
+        self.device.touch_home_button()
+
+        self.restore_prefs()
+
+    def load_reference_workload(self, contacts=None, sms=None, dialer=None, calendar=None):
+        """Restart B2G with the prebuilt databases of the reference workload."""
+        self.device.load_reference_workload(
+            contacts=contacts, sms=sms, dialer=dialer, calendar=calendar)
+        # the restart started a new session, without the atoms or timeouts
+        self.set_timeouts()
+        FakeUpdateChecker(self.marionette).check_updates()
+        self.device = GaiaDevice(self.marionette,
+                                 manager=self.device_manager,
+                                 testvars=self.testvars)
+        self.apps = GaiaApps(self.marionette)
+        self.data_layer = GaiaData(self.marionette, self.testvars)
+        self.accessibility = Accessibility(self.marionette)
+        self.cleanup_gaia(full_reset=False)
+
     def connect_to_local_area_network(self):
         if not self.device.is_online:
             if self.testvars.get('wifi') and self.device.has_wifi:
@@ -942,49 +1430,47 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
         return Wait(self.marionette, timeout, ignored_exceptions=NoSuchElementException).until(
             lambda m: m.find_element(by, locator))
 
+    def no_implicit_wait(self):
+        """Returns a context manager disabling the implicit wait of find_element."""
+        return MarionetteClientState.install(self.marionette).no_implicit_wait()
+
     def wait_for_element_not_present(self, by, locator, timeout=None):
-        self.marionette.set_search_timeout(0)
-        try:
-            return Wait(self.marionette, timeout).until(
-                lambda m: not m.find_element(by, locator))
-        except NoSuchElementException:
-            pass
-        self.marionette.set_search_timeout(self.marionette.timeout or 10000)
+        with self.no_implicit_wait():
+            try:
+                return Wait(self.marionette, timeout).until(
+                    lambda m: not m.find_element(by, locator))
+            except NoSuchElementException:
+                pass
 
     def wait_for_element_displayed(self, by, locator, timeout=None):
         Wait(self.marionette, timeout, ignored_exceptions=[NoSuchElementException, StaleElementException]).until(
             lambda m: m.find_element(by, locator).is_displayed())
 
     def wait_for_element_not_displayed(self, by, locator, timeout=None):
-        self.marionette.set_search_timeout(0)
-        try:
-            Wait(self.marionette, timeout, ignored_exceptions=StaleElementException).until(
-                lambda m: not m.find_element(by, locator).is_displayed())
-        except NoSuchElementException:
-            pass
-        self.marionette.set_search_timeout(self.marionette.timeout or 10000)
+        with self.no_implicit_wait():
+            try:
+                Wait(self.marionette, timeout, ignored_exceptions=StaleElementException).until(
+                    lambda m: not m.find_element(by, locator).is_displayed())
+            except NoSuchElementException:
+                pass
 
     def wait_for_condition(self, method, timeout=None, message=None):
         Wait(self.marionette, timeout).until(method, message=message)
 
     def is_element_present(self, by, locator):
-        self.marionette.set_search_timeout(0)
-        try:
-            self.marionette.find_element(by, locator)
-            return True
-        except NoSuchElementException:
-            return False
-        finally:
-            self.marionette.set_search_timeout(self.marionette.timeout or 10000)
+        with self.no_implicit_wait():
+            try:
+                self.marionette.find_element(by, locator)
+                return True
+            except NoSuchElementException:
+                return False
 
     def is_element_displayed(self, by, locator):
-        self.marionette.set_search_timeout(0)
-        try:
-            return self.marionette.find_element(by, locator).is_displayed()
-        except NoSuchElementException:
-            return False
-        finally:
-            self.marionette.set_search_timeout(self.marionette.timeout or 10000)
+        with self.no_implicit_wait():
+            try:
+                return self.marionette.find_element(by, locator).is_displayed()
+            except NoSuchElementException:
+                return False
 
     def tearDown(self):
         if self.device.is_desktop_b2g and self.device.storage_path:
@@ -992,6 +1478,8 @@ class GaiaTestCase(MarionetteTestCase, B2GTestCaseMixin):
         self.apps = None
         self.data_layer = None
         MarionetteTestCase.tearDown(self)
+        if self.command_profile:
+            MarionetteCommandProfiler.install(self.marionette).stop_test()
 
 
 class GaiaEnduranceTestCase(GaiaTestCase, EnduranceTestCaseMixin, MemoryEnduranceTestCaseMixin):
@@ -1017,5 +1505,5 @@ class GaiaEnduranceTestCase(GaiaTestCase, EnduranceTestCaseMixin, MemoryEnduranc
         # Close the current apps from the cards view
         self.cards_view.close_app("search")
 
-        # Sleep a bit
-        time.sleep(5)
+        # Wait for the cards view to settle
+        self.device.wait_for_idle(selector='#cards-view', quiet_ms=1000)
@@ -2,6 +2,7 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import json
 import os
 import sys
 import textwrap
@@ -18,6 +19,28 @@ class GaiaOptionsMixin(object):
                          dest='restart',
                          default=False,
                          help='restart target instance between tests')
+        group.add_option('--incremental-cleanup',
+                         action='store_true',
+                         dest='incremental_cleanup',
+                         default=False,
+                         help='only undo the changes made by the previous test '
+                              'instead of fully resetting Gaia before each test')
+        group.add_option('--golden-profile',
+                         action='store_true',
+                         dest='golden_profile',
+                         default=False,
+                         help='when restarting desktop B2G, start from a copy of '
+                              'the profile captured after the first boot')
+        group.add_option('--command-profile',
+                         dest='command_profile',
+                         metavar='PATH',
+                         help='record the Marionette commands sent by each test '
+                              'and write a JSON summary to PATH')
+        group.add_option('--sleep-profile',
+                         dest='sleep_profile',
+                         metavar='PATH',
+                         help='record the time each test spends in time.sleep '
+                              'and write a JSON summary to PATH')
 
 
 class GaiaTestRunnerMixin(object):
@@ -55,3 +78,34 @@ class GaiaTestRunnerMixin(object):
                 sys.exit(1)
             print 'Continuing with test run...\n'
 
+        self.command_profile = kwargs.get('command_profile')
+        if self.command_profile:
+            self.mixin_run_tests.append(self.write_command_profile)
+        self.sleep_profile = kwargs.get('sleep_profile')
+        if self.sleep_profile:
+            self.mixin_run_tests.append(self.write_sleep_profile)
+
+    def write_command_profile(self, tests):
+        from gaiatest.command_profiler import MarionetteCommandProfiler
+        profiler = getattr(self.marionette, 'command_profiler', None)
+        if profiler is None:
+            return
+        summary = profiler.summary
+        with open(self.command_profile, 'w') as f:
+            json.dump(summary, f, indent=2)
+        self.logger.info('Marionette commands sent during the test run:\n%s' %
+                         MarionetteCommandProfiler.format_table(summary['suite']))
+        self.logger.info('Marionette command profile written to: %s' %
+                         self.command_profile)
+
+    def write_sleep_profile(self, tests):
+        from gaiatest.sleep_profiler import SleepProfiler
+        profiler = SleepProfiler._profiler
+        if profiler is None:
+            return
+        summary = profiler.summary
+        with open(self.sleep_profile, 'w') as f:
+            json.dump(summary, f, indent=2)
+        self.logger.info('Sleeps taken during the test run:\n%s' %
+                         SleepProfiler.format_table(summary['suite']))
+        self.logger.info('Sleep profile written to: %s' % self.sleep_profile)
@@ -0,0 +1,118 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+
+import mozlog
+
+
+class ReferenceWorkload(object):
+    """Pushes the prebuilt databases of test_media/reference-workload.
+
+    This mirrors test_media/reference-workload/makeReferenceWorkload.sh.
+    B2G must be stopped while the databases are pushed, and root is the
+    directory holding the IndexedDB storage: /data/local on a device or the
+    profile directory for desktop B2G.
+    """
+
+    # database name, origin and attachments archive, by workload
+    databases = {
+        'contacts': ('3406066227csotncta', 'chrome', 'ContactPictures-%d.tar.gz'),
+        'sms': ('226660312ssm', 'chrome', 'Attachments-%d.tar.gz'),
+        'dialer': ('2584670174dsitanleecreR', 'communications', None),
+        'calendar': ('125582036br2agd-nceal', 'calendar', None)}
+
+    # sqlite file for each workload, by count
+    filenames = {
+        'contacts': 'contactsDb-%d.sqlite',
+        'sms': 'smsDb-%d.sqlite',
+        'dialer': 'dialerDb-%d.sqlite',
+        'calendar': 'calendarDb-%d.sqlite'}
+
+    default_path = os.path.abspath(os.path.join(
+        os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, os.pardir,
+        'test_media', 'reference-workload'))
+
+    def __init__(self, file_manager, path=None):
+        self._logger = mozlog.getLogger('ReferenceWorkload')
+        self.file_manager = file_manager
+        self.path = path or self.default_path
+
+    def available(self, workload):
+        """Returns the counts of the workload that can be loaded."""
+        prefix, suffix = self.filenames[workload].split('%d')
+        return sorted(int(f[len(prefix):-len(suffix)]) for f in os.listdir(self.path)
+                      if f.startswith(prefix) and f.endswith(suffix))
+
+    def indexeddb_base(self, root):
+        """Returns the IndexedDB directories for chrome and for apps."""
+        for base in ['storage/permanent', 'storage/persistent', 'indexedDB']:
+            if self.file_manager.dir_exists('/'.join([root, base, 'chrome'])):
+                if base == 'storage/permanent':
+                    return '/'.join([root, base]), '/'.join([root, 'storage/default'])
+                return '/'.join([root, base]), '/'.join([root, base])
+        raise Exception('Unable to find the IndexedDB directory in %s' % root)
+
+    def app_directory(self, root, origin):
+        """Returns the IndexedDB directory name of an installed app."""
+        webapps = json.loads(self.file_manager.read_file(
+            '/'.join([root, 'webapps', 'webapps.json'])))
+        for domain, app in webapps.items():
+            if domain.startswith(origin):
+                return '%s+f+app+++%s' % (app['localId'], domain)
+        raise Exception('Unable to find the %s app in %s' % (origin, root))
+
+    def load(self, root, **counts):
+        """Push the databases for the given counts, such as contacts=500."""
+        chrome_base, app_base = self.indexeddb_base(root)
+        idb = self.file_manager.dir_exists('/'.join([chrome_base, 'chrome', 'idb']))
+        for workload, count in counts.items():
+            if count is None:
+                continue
+            if count not in self.available(workload):
+                raise Exception('No %s reference workload of size %d, available sizes '
+                                'are %s' % (workload, count, self.available(workload)))
+            name, origin, attachments = self.databases[workload]
+            if origin == 'chrome':
+                directory = '/'.join([chrome_base, origin])
+            else:
+                directory = '/'.join([app_base, self.app_directory(root, origin)])
+            if idb:
+                directory += '/idb'
+
+            self._logger.info('Loading %d %s' % (count, workload))
+            self.push(os.path.join(self.path, self.filenames[workload] % count),
+                      directory, '%s.sqlite' % name)
+            if attachments:
+                files = '/'.join([directory, '%s.files' % name])
+                self.file_manager.remove(files)
+                self.push_archive(os.path.join(self.path, attachments % count), files)
+
+    def push(self, local_path, remote_path, filename):
+        # the file manager keeps the local filename so stage a renamed copy
+        staging = tempfile.mkdtemp()
+        try:
+            staged = os.path.join(staging, filename)
+            shutil.copy(local_path, staged)
+            self.file_manager.push_file(staged, remote_path)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def push_archive(self, archive, remote_path):
+        staging = tempfile.mkdtemp()
+        try:
+            with tarfile.open(archive) as tar:
+                tar.extractall(staging)
+            source = staging
+            entries = os.listdir(staging)
+            # the attachments are archived in a single top level directory
+            if len(entries) == 1 and os.path.isdir(os.path.join(staging, entries[0])):
+                source = os.path.join(staging, entries[0])
+            self.file_manager.push_tree(source, remote_path, compress=True)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
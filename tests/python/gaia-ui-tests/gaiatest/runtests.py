@@ -17,7 +17,10 @@ from marionette.runtests import cli
 import mozlog
 
 from gaiatest import __name__
-from gaiatest import (GaiaTestCase,
+from gaiatest import (GaiaScripts,
+                      GaiaTestCase,
+                      MarionetteCommandProfiler,
+                      SleepProfiler,
                       GaiaOptionsMixin,
                       GaiaTestRunnerMixin,
                       TreeherderOptionsMixin,
@@ -68,7 +71,7 @@ class GaiaTestRunner(BaseMarionetteTestRunner, GaiaTestRunnerMixin,
             if marionette.session is not None:
                 try:
                     marionette.switch_to_frame()
-                    rv['settings'] = json.dumps(marionette.execute_async_script("""
+                    rv['settings'] = json.dumps(GaiaScripts(marionette).execute_async_script('all_settings', """
 SpecialPowers.pushPermissions([
   {type: 'settings-read', allow: true, context: document},
   {type: 'settings-api-read', allow: true, context: document},
@@ -85,7 +88,30 @@ SpecialPowers.pushPermissions([
                     logger.warning('Failed to gather test failure debug.', exc_info=True)
             return rv
 
-        BaseMarionetteTestRunner.__init__(self, result_callbacks=[gather_debug], **kwargs)
+        def gather_command_profile(test, status):
+            rv = {}
+            marionette = test._marionette_weakref()
+            profiler = getattr(marionette, 'command_profiler', None)
+            if profiler and test.id() in profiler.tests:
+                rv['marionette commands'] = MarionetteCommandProfiler.format_table(
+                    profiler.summarize(profiler.tests[test.id()]))
+            return rv
+
+        def gather_sleep_profile(test, status):
+            rv = {}
+            profiler = SleepProfiler._profiler
+            if profiler and test.id() in profiler.tests:
+                rv['sleeps'] = SleepProfiler.format_table(
+                    profiler.summarize(profiler.tests[test.id()]))
+            return rv
+
+        result_callbacks = [gather_debug]
+        if kwargs.get('command_profile'):
+            result_callbacks.append(gather_command_profile)
+        if kwargs.get('sleep_profile'):
+            result_callbacks.append(gather_sleep_profile)
+
+        BaseMarionetteTestRunner.__init__(self, result_callbacks=result_callbacks, **kwargs)
         GaiaTestRunnerMixin.__init__(self, **kwargs)
         HTMLReportingTestRunnerMixin.__init__(self, name=__name__,
                                               version=__version__, **kwargs)
@@ -0,0 +1,97 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from collections import OrderedDict
+import os
+import sys
+import time
+
+
+class SleepProfiler(object):
+    """Records the fixed sleeps taken by gaiatest.
+
+    Once installed, time.sleep is wrapped and every call made directly from
+    a module in the gaiatest package (including its tests) is recorded with
+    the requested and the actual time slept and its call site. Calls from
+    other packages are passed through untouched. Sleeps are grouped by the
+    test that was running at the time.
+    """
+
+    package_root = os.path.dirname(os.path.abspath(__file__))
+    _profiler = None
+
+    def __init__(self):
+        self.tests = OrderedDict()
+        self.current = None
+        self._sleep = time.sleep
+        time.sleep = self.sleep
+
+    @classmethod
+    def install(cls):
+        """Returns the profiler, wrapping time.sleep if needed."""
+        if cls._profiler is None:
+            cls._profiler = cls()
+        return cls._profiler
+
+    def sleep(self, seconds):
+        call_site = self.current is not None and self.call_site()
+        start = time.time()
+        try:
+            return self._sleep(seconds)
+        finally:
+            if call_site:
+                self.current.append({
+                    'requested': seconds,
+                    'duration': time.time() - start,
+                    'call_site': call_site})
+
+    def call_site(self):
+        frame = sys._getframe(2)
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(self.package_root):
+            return '%s:%d (%s)' % (os.path.relpath(filename, self.package_root),
+                                   frame.f_lineno, frame.f_code.co_name)
+
+    def start_test(self, test_id):
+        # replaces the previous test even if it was never stopped
+        self.current = self.tests.setdefault(test_id, [])
+
+    def stop_test(self):
+        self.current = None
+
+    @staticmethod
+    def summarize(sleeps):
+        """Returns the total time slept, overall and by call site."""
+        summary = {'count': len(sleeps),
+                   'duration': sum(s['duration'] for s in sleeps),
+                   'call_sites': {}}
+        for s in sleeps:
+            totals = summary['call_sites'].setdefault(
+                s['call_site'], {'count': 0, 'duration': 0})
+            totals['count'] += 1
+            totals['duration'] += s['duration']
+        return summary
+
+    @property
+    def summary(self):
+        return {
+            'tests': OrderedDict((test_id, self.summarize(sleeps))
+                                 for test_id, sleeps in self.tests.items()),
+            'suite': self.summarize(
+                [s for sleeps in self.tests.values() for s in sleeps])}
+
+    @staticmethod
+    def format_table(summary, limit=10):
+        """Returns a plain text table of the call sites that slept longest in a summary."""
+        lines = ['%d sleeps, %.3fs' % (summary['count'], summary['duration'])]
+        call_sites = sorted(summary['call_sites'].items(),
+                            key=lambda item: item[1]['duration'],
+                            reverse=True)[:limit]
+        width = max([len(key) for key, totals in call_sites] + [len('call sites')])
+        lines.append('')
+        lines.append('%s  %6s  %9s' % ('call sites'.ljust(width), 'count', 'time (s)'))
+        for key, totals in call_sites:
+            lines.append('%s  %6d  %9.3f' % (
+                key.ljust(width), totals['count'], totals['duration']))
+        return '\n'.join(lines)
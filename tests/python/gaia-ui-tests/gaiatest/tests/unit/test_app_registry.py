@@ -0,0 +1,24 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from gaiatest import GaiaTestCase
+
+
+class TestAppRegistry(GaiaTestCase):
+
+    def test_find_app(self):
+        app = self.apps.find_app('Clock')
+        self.assertEqual(app['manifestURL'], 'app://clock.gaiamobile.org/manifest.webapp')
+        self.assertTrue(self.apps.is_app_installed('clock'))
+        self.assertFalse(self.apps.is_app_installed('Not An App'))
+
+    def test_entry_points(self):
+        app = self.apps.find_app('Phone')
+        self.assertEqual(app['manifestURL'], 'app://communications.gaiamobile.org/manifest.webapp')
+        self.assertEqual(app['entryPoint'], 'dialer')
+
+    def test_registry_is_cached(self):
+        apps = self.apps.registry()
+        self.assertEqual(self.apps.registry(check=False), apps)
+        self.assertEqual(self.apps.registry(), apps)
@@ -0,0 +1,18 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from gaiatest import GaiaTestCase
+from gaiatest import GaiaApps
+from gaiatest import GaiaAtoms
+
+
+class TestAtoms(GaiaTestCase):
+
+    def test_atoms_imported_once_per_session(self):
+        imports_avoided = GaiaAtoms.imports_avoided
+        GaiaApps(self.marionette)
+        GaiaApps(self.marionette)
+        self.assertEqual(GaiaAtoms.imports_avoided, imports_avoided + 2)
+        self.assertTrue(self.marionette.execute_script(
+            'return typeof GaiaApps === "object";'))
@@ -0,0 +1,48 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from gaiatest import GaiaDevice, GaiaTestCase
+from gaiatest.mocks.mock_contact import MockContact
+
+
+class TestCleanupIncrementally(GaiaTestCase):
+
+    def test_cleanup_incrementally(self):
+        # the first call captures the baseline state
+        self.cleanup_incrementally()
+        baseline = self.gaia_state
+
+        self.data_layer.set_volume(5)
+        self.data_layer.set_setting('language.current', 'fr')
+        self.data_layer.insert_contact(MockContact())
+        self.assertEqual(self.data_layer.contacts_count, 1)
+
+        self.cleanup_incrementally()
+        self.assertEqual(self.data_layer.get_setting(
+            'audio.volume.content'), 0)
+        self.assertEqual(self.data_layer.get_setting(
+            'language.current'), 'en-US')
+        self.assertEqual(self.data_layer.contacts_count, 0)
+        self.assertEqual(self.gaia_state['storage_items'],
+                         baseline['storage_items'])
+
+
+class TestCleanupIncrementallyAcrossTests(GaiaTestCase):
+
+    # the baseline captured by the first test
+    baseline = None
+
+    def test_1_capture_baseline(self):
+        self.cleanup_incrementally()
+        self.assertIsNotNone(GaiaDevice.gaia_baseline)
+        TestCleanupIncrementallyAcrossTests.baseline = GaiaDevice.gaia_baseline
+        self.data_layer.set_volume(5)
+
+    def test_2_reuse_baseline(self):
+        if self.restart or self.baseline is None:
+            self.skipTest('B2G was restarted, or the first test did not run')
+        self.cleanup_incrementally()
+        self.assertIs(GaiaDevice.gaia_baseline, self.baseline)
+        self.assertEqual(self.data_layer.get_setting(
+            'audio.volume.content'), 0)
@@ -25,3 +25,32 @@ class TestContacts(GaiaTestCase):
         self.assertEqual(len(self.data_layer.all_contacts), 1)
         self.data_layer.remove_all_contacts()
         self.assertEqual(self.data_layer.all_contacts, [])
+
+    def test_insert_contacts_in_chrome_context(self):
+        with self.data_layer.chrome_context():
+            self.data_layer.insert_contact(MockContact())
+            self.data_layer.insert_contact(MockContact())
+            self.assertEqual(self.marionette.client_state.context,
+                             self.marionette.CONTEXT_CHROME)
+        self.assertEqual(self.marionette.client_state.context,
+                         self.marionette.CONTEXT_CONTENT)
+        self.assertEqual(self.data_layer.contacts_count, 2)
+
+    def test_chrome_context_restores_callers_context(self):
+        self.marionette.set_context(self.marionette.CONTEXT_CHROME)
+        # forget the tracked context, as if it had been changed elsewhere
+        self.marionette.client_state.context = None
+        with self.data_layer.chrome_context():
+            self.data_layer.insert_contact(MockContact())
+        self.assertEqual(self.marionette.client_state.context,
+                         self.marionette.CONTEXT_CHROME)
+        self.marionette.set_context(self.marionette.CONTEXT_CONTENT)
+
+    def test_insert_contacts(self):
+        ids = self.data_layer.insert_contacts(
+            (MockContact() for i in range(5)), batch_size=2)
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
+        self.assertEqual(self.data_layer.contacts_count, 5)
+        self.assertEqual(sorted(c['id'] for c in self.data_layer.all_contacts),
+                         sorted(ids))
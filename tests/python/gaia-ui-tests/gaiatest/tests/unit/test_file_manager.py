@@ -2,6 +2,10 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import os
+import shutil
+import tempfile
+
 from gaiatest import GaiaTestCase
 
 
@@ -26,6 +30,17 @@ class TestFileManager(GaiaTestCase):
             self.assertTrue(self.device.file_manager.file_exists(
                 '/'.join([self.device.storage_path, filename])))
 
+    def test_duplicate_file_without_extension(self):
+        path = '/'.join([self.device.storage_path, 'foo'])
+        self.device.file_manager.push_file(self.resource('IMG_0001.jpg'), path)
+        path = '/'.join([path, 'IMG_0001.jpg'])
+        bare = path.rpartition('.')[0]
+        self.device.file_manager.copy_file(path, bare)
+        self.device.file_manager.duplicate_file(bare, 3)
+        self.assertFalse(self.device.file_manager.file_exists(bare))
+        for i in range(1, 4):
+            self.assertTrue(self.device.file_manager.file_exists('%s_%d' % (bare, i)))
+
     def test_list_items(self):
         path = '/'.join([self.device.storage_path, 'foo'])
         self.device.file_manager.make_dirs('/'.join([path, 'bar']))
@@ -44,12 +59,78 @@ class TestFileManager(GaiaTestCase):
         self.assertTrue(self.device.file_manager.file_exists(
             '/'.join([self.device.storage_path, filename])))
 
+    def test_push_and_pull_tree(self):
+        local = tempfile.mkdtemp()
+        pulled = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(local, 'foo', 'bar'))
+            shutil.copy(self.resource('IMG_0001.jpg'), os.path.join(local, 'foo', 'bar'))
+            shutil.copy(self.resource('MUS_0001.mp3'), local)
+            path = '/'.join([self.device.storage_path, 'tree'])
+            self.device.file_manager.push_tree(local, path, compress=True)
+            self.assertTrue(self.device.file_manager.file_exists(
+                '/'.join([path, 'foo', 'bar', 'IMG_0001.jpg'])))
+            self.assertTrue(self.device.file_manager.file_exists(
+                '/'.join([path, 'MUS_0001.mp3'])))
+
+            self.device.file_manager.pull_tree(path, pulled)
+            self.assertTrue(os.path.isfile(os.path.join(pulled, 'foo', 'bar', 'IMG_0001.jpg')))
+            self.assertTrue(os.path.isfile(os.path.join(pulled, 'MUS_0001.mp3')))
+            self.assertEqual(sorted(os.listdir(pulled)), ['MUS_0001.mp3', 'foo'])
+            self.assertEqual(self.device.file_manager.list_items(
+                self.device.storage_path), ['tree'])
+        finally:
+            shutil.rmtree(local)
+            shutil.rmtree(pulled)
+
     def test_remove_dir(self):
         path = '/'.join([self.device.storage_path, 'foo'])
         self.device.file_manager.make_dirs('/'.join([path, 'bar']))
         self.device.file_manager.remove(path)
         self.assertFalse(self.device.file_manager.dir_exists(path))
 
+    def test_remove_many(self):
+        foo = '/'.join([self.device.storage_path, 'foo'])
+        bar = '/'.join([self.device.storage_path, 'bar'])
+        missing = '/'.join([self.device.storage_path, 'missing'])
+        self.device.file_manager.make_dirs('/'.join([foo, 'baz']))
+        self.device.file_manager.push_file(self.resource('IMG_0001.jpg'), bar)
+        removed = self.device.file_manager.remove_many([foo, bar, missing])
+        self.assertEqual(sorted(removed), sorted([foo, bar]))
+        self.assertFalse(self.device.file_manager.dir_exists(foo))
+        self.assertFalse(self.device.file_manager.dir_exists(bar))
+
+    def test_remove_many_paths(self):
+        # more paths than fit in a single shell command
+        path = '/'.join([self.device.storage_path, 'IMG_0001.jpg'])
+        self.push_resource('IMG_0001.jpg', count=200)
+        paths = self.device.file_manager._duplicate_paths(path, 200)
+        removed = self.device.file_manager.remove_many(paths)
+        self.assertEqual(sorted(removed), sorted(paths))
+        self.assertEqual(self.device.file_manager.list_items(
+            self.device.storage_path), [])
+
+    def test_remove_many_literal_paths(self):
+        if not self.device.is_desktop_b2g:
+            self.skipTest('wildcards are expanded on the device')
+        path = '/'.join([self.device.storage_path, 'IMG_0001.jpg'])
+        self.push_resource('IMG_0001.jpg')
+        wildcard = '/'.join([self.device.storage_path, 'IMG_*.jpg'])
+        self.assertEqual(self.device.file_manager.remove_many([wildcard]), [])
+        self.assertTrue(self.device.file_manager.file_exists(path))
+
+    def test_wipe_dirs(self):
+        path = '/'.join([self.device.storage_path, 'foo'])
+        self.device.file_manager.push_file(self.resource('IMG_0001.jpg'), path)
+        self.device.file_manager.make_dirs('/'.join([path, 'bar', 'baz']))
+        self.device.file_manager.make_dirs('/'.join([path, '.hidden']))
+        removed = self.device.file_manager.wipe_dirs([path])
+        self.assertEqual(sorted(removed), ['/'.join([path, '.hidden']),
+                                           '/'.join([path, 'IMG_0001.jpg']),
+                                           '/'.join([path, 'bar'])])
+        self.assertTrue(self.device.file_manager.dir_exists(path))
+        self.assertEqual(self.device.file_manager.list_items(path), [])
+
     def test_remove_file(self):
         filename = 'IMG_0001.jpg'
         self.device.file_manager.push_file(self.resource(filename))
@@ -0,0 +1,35 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from gaiatest import GaiaTestCase
+from gaiatest import GaiaScripts
+
+
+class TestGaiaScripts(GaiaTestCase):
+
+    def setUp(self):
+        GaiaTestCase.setUp(self)
+        self.marionette.switch_to_frame()
+        self.scripts = GaiaScripts(self.marionette)
+
+    def test_execute_script(self):
+        body = 'return arguments[0] + arguments[1];'
+        self.assertEqual(self.scripts.execute_script('add', body, [1, 2]), 3)
+        self.assertEqual(self.scripts.execute_script('add', body, [3, 4]), 7)
+
+    def test_execute_async_script(self):
+        body = 'var a = arguments[0]; waitFor(function() { marionetteScriptFinished(a * 2); }, ' \
+               'function() { return true; });'
+        self.assertEqual(self.scripts.execute_async_script('double', body, [2]), 4)
+        self.assertEqual(self.scripts.execute_async_script('double', body, [3]), 6)
+
+    def test_reregister_after_reload(self):
+        body = 'return document.readyState;'
+        self.scripts.execute_script('ready_state', body)
+        self.marionette.execute_script('delete window.wrappedJSObject.gaiatestScripts;')
+        self.assertEqual(self.scripts.execute_script('ready_state', body), 'complete')
+
+    def test_body_ending_in_comment(self):
+        body = 'return 1; // the closing brace must not be commented out'
+        self.assertEqual(self.scripts.execute_script('comment', body), 1)
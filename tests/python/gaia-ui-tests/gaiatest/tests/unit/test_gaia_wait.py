@@ -0,0 +1,72 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+try:
+    from marionette.errors import TimeoutException
+except:
+    from marionette_driver.errors import TimeoutException
+from gaiatest import GaiaTestCase
+from gaiatest import GaiaWait
+
+
+class TestGaiaWait(GaiaTestCase):
+
+    def setUp(self):
+        GaiaTestCase.setUp(self)
+        self.marionette.switch_to_frame()
+        self.wait = GaiaWait(self.marionette, timeout=1)
+
+    def test_wait_for_element(self):
+        element = self.wait.for_element_displayed('#homescreen')
+        self.assertEqual(element.get_attribute('id'), 'homescreen')
+        self.wait.for_element_not_present('#not-present')
+        self.wait.for_element_not_displayed('#not-present')
+
+    def test_wait_until(self):
+        self.assertEqual(self.wait.until('return 1 + 1;'), 2)
+        self.assertRaises(TimeoutException, self.wait.until, 'return false;')
+
+    def test_wait_for_idle_element_not_present(self):
+        self.assertRaises(TimeoutException, self.wait.for_idle, '#not-present', quiet_ms=100)
+
+    def test_wait_for_idle_during_transition(self):
+        self.marionette.execute_script("""
+            var system = window.wrappedJSObject;
+            var moving = system.document.createElement('div');
+            moving.id = 'gaiatest-moving';
+            moving.style.cssText = 'width: 10px; height: 10px; transition: transform 2s linear;';
+            system.document.body.appendChild(moving);
+            moving.getBoundingClientRect();
+            moving.style.transform = 'translateX(100px)';""")
+        try:
+            # the transition runs for longer than the quiet period and the timeout
+            self.assertRaises(TimeoutException, self.wait.for_idle, '#gaiatest-moving', quiet_ms=100)
+            GaiaWait(self.marionette, timeout=5).for_idle('#gaiatest-moving', quiet_ms=100)
+            self.assertEqual(self.marionette.execute_script("""
+                var moving = window.wrappedJSObject.document.getElementById('gaiatest-moving');
+                return window.getComputedStyle(moving).transform;"""), 'matrix(1, 0, 0, 1, 100, 0)')
+        finally:
+            self.marionette.execute_script("""
+                var system = window.wrappedJSObject;
+                system.document.body.removeChild(system.document.getElementById('gaiatest-moving'));""")
+
+    def test_wait_for_idle(self):
+        self.marionette.execute_script("""
+            var system = window.wrappedJSObject;
+            var busy = system.document.createElement('div');
+            busy.id = 'gaiatest-busy';
+            system.document.body.appendChild(busy);
+            system.gaiatestInterval = system.setInterval(function() {
+              busy.textContent = Date.now();
+            }, 50);""")
+        try:
+            self.assertRaises(TimeoutException, self.wait.for_idle, '#gaiatest-busy', quiet_ms=100)
+            self.marionette.execute_script(
+                'window.wrappedJSObject.clearInterval(window.wrappedJSObject.gaiatestInterval);')
+            self.device.wait_for_idle(selector='#gaiatest-busy', quiet_ms=100)
+        finally:
+            self.marionette.execute_script("""
+                var system = window.wrappedJSObject;
+                system.clearInterval(system.gaiatestInterval);
+                system.document.body.removeChild(system.document.getElementById('gaiatest-busy'));""")
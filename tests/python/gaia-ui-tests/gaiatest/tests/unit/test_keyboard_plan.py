@@ -0,0 +1,64 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import time
+
+from gaiatest import GaiaTestCase
+from gaiatest.apps.keyboard.app import Keyboard
+from gaiatest.apps.ui_tests.app import UiTests
+
+
+class TestKeyboardPlan(GaiaTestCase):
+
+    pages = [list('abcdefghijklmnopqrstuvwxyz,.'), list('123@'), list('~')]
+    state = {'page': 0, 'upper': False, 'locked': False}
+
+    def setUp(self):
+        GaiaTestCase.setUp(self)
+        self.keyboard = Keyboard(self.marionette)
+
+    def page_key(self, page):
+        return self.keyboard._page_switching_key_locator[1] % page
+
+    def test_plan_run(self):
+        plan_run = self.keyboard._plan_run
+        self.assertEqual(plan_run('ab c1', self.pages, self.state), 'ab c')
+        self.assertEqual(plan_run('aBc', self.pages, self.state), 'a')
+        self.assertEqual(plan_run('1', self.pages, self.state), '')
+        # space switches back to the default page, so it ends the run
+        on_page_1 = dict(self.state, page=1)
+        self.assertEqual(plan_run('12 3', self.pages, on_page_1), '12 ')
+        self.assertEqual(plan_run('1@2', self.pages, on_page_1), '1@')
+
+    def test_plan_transitions(self):
+        plan_transitions = self.keyboard._plan_transitions
+        self.assertEqual(plan_transitions('1', self.pages, self.state),
+                         [(self.page_key(1), {'page': 1, 'upper': None})])
+        self.assertEqual(plan_transitions('~', self.pages, self.state),
+                         [(self.page_key(1), {'page': 1, 'upper': None}),
+                          (self.page_key(2), {'page': 2, 'upper': None})])
+        self.assertEqual(plan_transitions('B', self.pages, self.state),
+                         [(self.keyboard._key_locator(self.keyboard._upper_case_key)[1],
+                           {'page': 0, 'upper': True})])
+        self.assertEqual(plan_transitions('a', self.pages, dict(self.state, page=1)),
+                         [(self.page_key(0), {'page': 0, 'upper': None})])
+        # characters the plan does not cover are typed key by key
+        self.assertIsNone(plan_transitions('%', self.pages, self.state))
+        self.assertIsNone(plan_transitions(u'\xe9', self.pages, self.state))
+
+    def test_send_with_mispredicted_layout(self):
+        ui_tests = UiTests(self.marionette)
+        ui_tests.launch()
+        keyboard_page = ui_tests.tap_keyboard_option()
+        keyboard_page.switch_to_frame()
+        keyboard = keyboard_page.tap_text_input()
+
+        # the digits are not on the default page, so the planned run fails
+        keyboard._layout_pages = lambda: [list('ab12'), [], []]
+        start = time.time()
+        keyboard.send('ab12')
+        self.assertLess(time.time() - start, 10)
+
+        keyboard_page.switch_to_frame()
+        self.assertEqual(keyboard_page.text_input, 'ab12')
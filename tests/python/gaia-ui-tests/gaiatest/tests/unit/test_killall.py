@@ -7,6 +7,7 @@ import time
 from gaiatest import GaiaTestCase
 from gaiatest.apps.clock.app import Clock
 from gaiatest.apps.calendar.app import Calendar
+from gaiatest.apps.ftu.app import Ftu
 
 
 class TestKillAll(GaiaTestCase):
@@ -16,12 +17,19 @@ class TestKillAll(GaiaTestCase):
             self.apps.launch(app)
             time.sleep(1)
 
-        self.apps.kill_all()
+        killed = self.apps.kill_all()
+        self.assertEqual(sorted(a.name for a in killed), sorted([Calendar.name, Clock.name]))
+        self.check_no_apps_running()
+
+    def test_kill_all_with_ftu_running(self):
+        self.apps.launch(Ftu.name)
+        killed = self.apps.kill_all()
+        self.assertEqual([a.origin for a in killed], ['app://ftu.gaiamobile.org'])
         self.check_no_apps_running()
 
     def test_kill_all_with_no_apps_running(self):
         self.check_no_apps_running()
-        self.apps.kill_all()
+        self.assertEqual(self.apps.kill_all(), [])
         self.check_no_apps_running()
 
     def test_kill_all_twice(self):
@@ -0,0 +1,24 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+try:
+    from marionette.by import By
+except:
+    from marionette_driver.by import By
+from gaiatest import GaiaTestCase
+
+
+class TestNoImplicitWait(GaiaTestCase):
+
+    def test_no_implicit_wait(self):
+        state = self.marionette.client_state
+        search_timeout = state.search_timeout
+
+        with self.no_implicit_wait():
+            self.assertEqual(state.search_timeout, 0)
+            self.assertFalse(self.is_element_present(By.ID, 'not-present'))
+            self.assertFalse(self.is_element_displayed(By.ID, 'not-present'))
+            self.assertEqual(state.search_timeout, 0)
+
+        self.assertEqual(state.search_timeout, search_timeout)
@@ -0,0 +1,45 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from gaiatest import GaiaTestCase
+
+
+class TestPushCache(GaiaTestCase):
+
+    def setUp(self):
+        GaiaTestCase.setUp(self)
+        self.file_manager = self.device.file_manager
+        self.pushed = []
+        push_file = self.device.manager.pushFile
+
+        def record_push(local_path, remote_path, *args, **kwargs):
+            self.pushed.append(local_path)
+            return push_file(local_path, remote_path, *args, **kwargs)
+        self.device.manager.pushFile = record_push
+        self.addCleanup(setattr, self.device.manager, 'pushFile', push_file)
+
+    def test_push_file_again(self):
+        filename = 'IMG_0001.jpg'
+        path = '/'.join([self.device.storage_path, filename])
+        self.file_manager.push_file(self.resource(filename))
+        self.file_manager.remove(path)
+
+        self.pushed = []
+        self.file_manager.push_file(self.resource(filename))
+        self.assertEqual(self.pushed, [])
+        self.assertEqual(self.file_manager.read_file(path),
+                         open(self.resource(filename), 'rb').read())
+
+    def test_push_file_after_cache_is_full(self):
+        self.file_manager.cache_size = 1
+        self.addCleanup(delattr, self.file_manager, 'cache_size')
+        self.file_manager.push_file(self.resource('IMG_0001.jpg'))
+        self.file_manager.push_file(self.resource('MUS_0001.mp3'))
+        self.assertEqual(len(self.file_manager.list_items(
+            self.file_manager.cache_path)), 1)
+
+        # the first file was evicted, so it is pushed again
+        self.pushed = []
+        self.file_manager.push_file(self.resource('IMG_0001.jpg'))
+        self.assertEqual(self.pushed, [self.resource('IMG_0001.jpg')])
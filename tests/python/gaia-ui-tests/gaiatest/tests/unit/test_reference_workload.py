@@ -0,0 +1,23 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import os
+
+from gaiatest import GaiaTestCase
+from gaiatest.reference_workload import ReferenceWorkload
+
+
+class TestReferenceWorkload(GaiaTestCase):
+
+    def test_load_reference_workload(self):
+        path = self.testvars.get('reference_workload_path') or ReferenceWorkload.default_path
+        if not os.path.isdir(path):
+            self.skipTest('The reference workload is only available in a Gaia checkout')
+
+        self.load_reference_workload(contacts=200)
+        self.assertEqual(self.data_layer.contacts_count, 200)
+
+    def tearDown(self):
+        self.data_layer.remove_all_contacts()
+        GaiaTestCase.tearDown(self)
@@ -0,0 +1,37 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+try:
+    from marionette.errors import TimeoutException
+except:
+    from marionette_driver.errors import TimeoutException
+
+from gaiatest import GaiaTestCase
+
+
+class TestWaitForDisplayedApp(GaiaTestCase):
+
+    def test_wait_for_displayed_app(self):
+        self.apps.watch_transitions()
+        self.apps.launch('Clock', switch_to_frame=False)
+        app = self.apps.wait_for_displayed_app('Clock')
+        self.assertEqual(app.name, 'Clock')
+        self.assertEqual(app.origin, 'app://clock.gaiamobile.org')
+
+        transitions = [t for t in self.apps.transitions if t['type'] == 'appopened']
+        self.assertEqual(transitions[-1]['name'], 'Clock')
+        self.assertGreaterEqual(transitions[-1]['duration'], 0)
+
+    def test_wait_for_displayed_app_timeout(self):
+        self.assertRaises(TimeoutException, self.apps.wait_for_displayed_app, 'Clock', timeout=1)
+
+    def test_wait_for_displayed_app_matches_exact_name(self):
+        self.apps.launch('Clock', switch_to_frame=False)
+        self.assertRaises(TimeoutException, self.apps.wait_for_displayed_app, 'clock', timeout=1)
+        self.assertEqual(self.apps.wait_for_displayed_app('clock', ignore_case=True).name, 'Clock')
+
+    def test_switch_to_displayed_app(self):
+        self.apps.launch('Clock', switch_to_frame=False)
+        self.apps.switch_to_displayed_app('Clock')
+        self.assertIn('clock.gaiamobile.org', self.marionette.get_url())